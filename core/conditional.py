@@ -0,0 +1,89 @@
+"""
+Respuestas condicionales (ETag / Last-Modified) para endpoints públicos de lectura.
+
+Las vistas indican un "estado" barato de obtener (conteos y máximos de
+updated_at, o una huella de tablas pequeñas) sin construir el cuerpo de la
+respuesta. Si el cliente ya tiene esa versión (If-None-Match /
+If-Modified-Since) se responde 304 sin serializar nada.
+"""
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """ETag a partir de cualquier combinación de valores"""
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Agrega los encabezados ETag y Last-Modified a una respuesta"""
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """Retorna una respuesta 304 si el cliente ya tiene la versión actual, o None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    validators = set_validators(HttpResponse(), etag, last_modified)
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=_timestamp(last_modified),
+        response=validators
+    )
+    # Sin condiciones cumplidas Django retorna la misma respuesta recibida
+    return None if response is validators else response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para ListAPIView / ReadOnlyModelViewSet.
+
+    Las subclases implementan get_conditional_state() y retornan
+    (estado, última modificación); el estado puede ser cualquier valor que
+    cambie cuando cambian los datos de la respuesta.
+    """
+
+    def get_conditional_state(self):
+        raise NotImplementedError
+
+    def get_etag(self, state):
+        # La ruta completa distingue página y filtros; el formato, la
+        # respuesta JSON de la navegable
+        return make_etag(
+            state,
+            self.request.get_host(),
+            self.request.get_full_path(),
+            getattr(self.request, 'accepted_media_type', '')
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        state, last_modified = self.get_conditional_state()
+        etag = self.get_etag(state)
+
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,163 @@
+"""
+Snapshots JSON pre-comprimidos de los endpoints públicos de lectura.
+
+El catálogo, los planes y la configuración de las calculadoras cambian muy
+poco y se piden en cada visita. Al publicar, cada endpoint se renderiza una
+vez con su propia vista (como un visitante anónimo sin parámetros) y el
+resultado se escribe en API_SNAPSHOT_ROOT junto con su versión .gz:
+
+    <API_SNAPSHOT_ROOT>/api/products/products/index.json
+    <API_SNAPSHOT_ROOT>/api/products/products/index.json.gz
+
+Cada archivo se escribe en un temporal y se renombra, así nginx nunca lee un
+archivo a medias. nginx sirve los snapshots directamente (ver
+llevateloexpress_nginx.conf); si una solicitud llega igualmente a Django,
+SnapshotMiddleware la delega a nginx con X-Accel-Redirect sin tocar la base
+de datos. El middleware va después de CorsMiddleware para que la respuesta
+delegada lleve los encabezados CORS.
+
+La publicación está desactivada salvo que API_SNAPSHOTS_ENABLED sea True.
+"""
+import gzip
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.urls import resolve
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATHS = getattr(settings, 'API_SNAPSHOT_PATHS', [
+    '/api/products/products/',
+    '/api/products/categories/',
+    '/api/products/featured-products/',
+    '/api/financing/plans/',
+    '/api/financing/simulator/config/',
+    '/api/financing/calculator/config/',
+])
+SNAPSHOT_FILENAME = 'index.json'
+ACCEL_PREFIX = getattr(settings, 'API_SNAPSHOT_ACCEL_PREFIX', '/_snapshots')
+
+
+def snapshots_enabled():
+    return getattr(settings, 'API_SNAPSHOTS_ENABLED', False)
+
+
+def snapshot_root():
+    return getattr(settings, 'API_SNAPSHOT_ROOT', os.path.join(settings.BASE_DIR, 'snapshots'))
+
+
+def snapshot_file(path):
+    """Ruta en disco del snapshot de un endpoint"""
+    return os.path.join(snapshot_root(), path.strip('/'), SNAPSHOT_FILENAME)
+
+
+def _write_atomic(filename, content):
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(content)
+            output.flush()
+            os.fsync(output.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def render_endpoint(path):
+    """Renderiza un endpoint como lo vería un visitante anónimo; retorna bytes o None"""
+    from rest_framework.test import APIRequestFactory
+
+    host = getattr(settings, 'API_SNAPSHOT_HOST', 'llevateloexpress.com')
+    request = APIRequestFactory().get(path, HTTP_HOST=host, HTTP_ACCEPT='application/json', secure=True)
+    match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        logger.warning('Snapshot de %s omitido: respuesta %s', path, response.status_code)
+        return None
+    return response.content
+
+
+def publish_snapshot(path):
+    """Publica el snapshot de un endpoint; retorna el tamaño sin comprimir o None"""
+    content = render_endpoint(path)
+    filename = snapshot_file(path)
+    if content is None:
+        # Sin respuesta válida se retira el snapshot para que nginx pase a Django
+        for suffix in ('', '.gz'):
+            if os.path.exists(filename + suffix):
+                os.remove(filename + suffix)
+        return None
+
+    # Primero la versión comprimida para que nunca quede detrás de la plana
+    _write_atomic(filename + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+    _write_atomic(filename, content)
+    return len(content)
+
+
+def publish_snapshots(paths=None):
+    """Publica todos los snapshots; retorna {ruta: tamaño o None}"""
+    results = {}
+    for path in paths or SNAPSHOT_PATHS:
+        try:
+            results[path] = publish_snapshot(path)
+        except Exception:
+            logger.exception('Error publicando el snapshot de %s', path)
+            results[path] = None
+    return results
+
+
+def _publish_pending():
+    connection = transaction.get_connection()
+    if not getattr(connection, 'snapshot_publish_pending', False):
+        # Otra llamada de la misma transacción ya publicó
+        return
+    connection.snapshot_publish_pending = False
+    publish_snapshots()
+
+
+def schedule_publish():
+    """
+    Programa una publicación al confirmar la transacción actual. Varias
+    llamadas en la misma transacción generan una sola publicación: la
+    primera devolución de llamada publica y baja la marca, las demás no
+    hacen nada. Si la transacción se revierte la marca queda en alto, pero
+    sin devoluciones pendientes no tiene efecto hasta el próximo cambio.
+    """
+    if not snapshots_enabled():
+        return
+    transaction.get_connection().snapshot_publish_pending = True
+    transaction.on_commit(_publish_pending)
+
+
+class SnapshotMiddleware:
+    """
+    Delega a nginx (X-Accel-Redirect) las solicitudes GET sin parámetros a
+    endpoints con snapshot publicado, sin pasar por la vista ni la base de datos.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            snapshots_enabled()
+            and request.method in ('GET', 'HEAD')
+            and not request.GET
+            and request.path in SNAPSHOT_PATHS
+            and os.path.exists(snapshot_file(request.path))
+        ):
+            response = HttpResponse(content_type='application/json')
+            response['X-Accel-Redirect'] = f"{ACCEL_PREFIX}{request.path}{SNAPSHOT_FILENAME}"
+            return response
+        return self.get_response(request)
@@ -0,0 +1,70 @@
+"""
+Seguimiento de cambios de campos sin consultas adicionales.
+
+Los modelos que heredan LoadedValuesMixin guardan, al cargarse desde la base
+de datos (from_db), los valores originales de los campos listados en
+``tracked_fields``. Las señales pre_save/post_save pueden así saber qué
+cambió sin volver a leer la fila. Los valores se renuevan al terminar cada
+save(), después de que se ejecutaron las señales post_save.
+
+    class FinancingRequest(LoadedValuesMixin, models.Model):
+        tracked_fields = ('status',)
+
+    instance.get_loaded_value('status')   # valor en la base de datos, o None si es nueva
+    instance.has_changed('status')
+"""
+from django.db.models import DEFERRED
+
+
+class LoadedValuesMixin:
+    """Mixin para modelos: recuerda los valores cargados de ``tracked_fields``"""
+    tracked_fields = ()
+
+    @classmethod
+    def _tracked_attnames(cls):
+        return {cls._meta.get_field(name).attname for name in cls.tracked_fields}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        tracked = cls._tracked_attnames()
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in tracked and value is not DEFERRED
+        }
+        return instance
+
+    def _remember_values(self, attnames):
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for attname in attnames:
+            if attname in self.__dict__:
+                loaded[attname] = self.__dict__[attname]
+
+    def get_loaded_value(self, field_name, default=None):
+        """Valor del campo tal como está en la base de datos (default si la instancia es nueva)"""
+        attname = self._meta.get_field(field_name).attname
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def has_changed(self, field_name):
+        attname = self._meta.get_field(field_name).attname
+        loaded = getattr(self, '_loaded_values', {})
+        if attname not in loaded:
+            return self._state.adding
+        return loaded[attname] != getattr(self, attname)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Las señales post_save ya vieron los valores anteriores
+        tracked = self._tracked_attnames()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            tracked &= {self._meta.get_field(name).attname for name in update_fields}
+        self._remember_values(tracked)
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        tracked = self._tracked_attnames()
+        if fields is not None:
+            tracked &= {self._meta.get_field(name).attname for name in fields}
+        self._remember_values(tracked)
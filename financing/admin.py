@@ -6,13 +6,17 @@ from django.db.models import Sum, Count
 from django.utils.safestring import mark_safe
 from django.db.models import Q
 from django.contrib.admin import SimpleListFilter
+from django.template.response import TemplateResponse
+from django.urls import path
 from .models import (
     FinancingPlan, FinancingRequest, Payment, 
     PaymentSchedule, ApplicationStatusHistory,
     FinancingConfiguration, DownPaymentOption,
     FinancingTerm, PaymentFrequency, ProductCategory, SimulatorProduct, HelpText,
-    CalculatorMode, PaymentMethod, CompanyBankAccount  # PaymentAttachment comentado temporalmente
+    CalculatorMode, PaymentMethod, CompanyBankAccount, ProductQuote  # PaymentAttachment comentado temporalmente
 )
+from .aging import aging_totals
+from .liquidity import DEFAULT_MONTHS, load_pool, simulate_pool
 import datetime
 
 # Inline para el historial de estados
@@ -257,7 +261,8 @@ class FinancingRequestAdmin(admin.ModelAdmin):
         """Generar calendario de pagos para solicitudes aprobadas"""
         count = 0
         for app in queryset.filter(status='approved'):
-            app.calculate_payment_schedule()
+            # Pedido explícito: se guardan las cuotas aunque los cronogramas sean virtuales
+            app.calculate_payment_schedule(materialize=True)
             count += 1
         self.message_user(request, f'Calendario de pagos generado para {count} solicitudes.')
     generate_payment_schedule.short_description = "Generar calendario de pagos"
@@ -413,6 +418,30 @@ class PaymentScheduleAdmin(admin.ModelAdmin):
     def get_application_number(self, obj):
         return obj.application.application_number
     get_application_number.short_description = 'No. Solicitud'
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'aging-report/',
+                self.admin_site.admin_view(self.aging_report_view),
+                name='financing_paymentschedule_aging_report'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def aging_report_view(self, request):
+        """Antigüedad de la cartera vencida por tramo"""
+        buckets = aging_totals()
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Antigüedad de la cartera vencida',
+            'buckets': buckets,
+            'total_installments': sum(row['installments'] for row in buckets),
+            'total_amount': sum(row['amount'] for row in buckets),
+            'total_late_fees': sum(row['late_fees'] for row in buckets),
+        }
+        return TemplateResponse(request, 'admin/financing/aging_report.html', context)
 
 # Configuración del simulador
 class DownPaymentOptionInline(admin.TabularInline):
@@ -536,6 +565,56 @@ class CalculatorModeAdmin(admin.ModelAdmin):
         )
         
         return form
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'liquidity-report/',
+                self.admin_site.admin_view(self.liquidity_report_view),
+                name='financing_calculatormode_liquidity_report'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def liquidity_report_view(self, request):
+        """Reporte de liquidez del fondo de Compra Programada"""
+        try:
+            months = min(max(int(request.GET.get('months', DEFAULT_MONTHS)), 1), 120)
+            collection_rate = min(max(float(request.GET.get('collection_rate', 1)), 0), 1)
+        except ValueError:
+            months, collection_rate = DEFAULT_MONTHS, 1.0
+        
+        pool = load_pool(months=months)
+        results = simulate_pool(pool, collection_rate=collection_rate)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Liquidez del fondo de Compra Programada',
+            'months': months,
+            'collection_rate': collection_rate,
+            'contracts': len(pool),
+            'total_adjudications': sum(row['adjudications'] for row in results),
+            'results': results,
+        }
+        return TemplateResponse(request, 'admin/financing/liquidity_report.html', context)
+
+@admin.register(ProductQuote)
+class ProductQuoteAdmin(admin.ModelAdmin):
+    list_display = [
+        'product', 'calculator_mode', 'financing_plan', 'down_payment_percentage',
+        'term_months', 'payment_frequency', 'payment_amount', 'updated_at'
+    ]
+    list_filter = ['payment_frequency', 'calculator_mode', 'financing_plan']
+    search_fields = ['product__name']
+    list_select_related = ['product', 'calculator_mode', 'financing_plan']
+    
+    # La tabla se genera automáticamente (ver financing/quote_tables.py)
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
 
 @admin.register(PaymentMethod)
 class PaymentMethodAdmin(admin.ModelAdmin):
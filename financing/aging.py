@@ -0,0 +1,189 @@
+"""
+Antigüedad de la cartera vencida (tramos 1-30, 31-60, 61-90 y 90+ días).
+
+El reporte de cobranza lee DelinquencyBucket, que guarda por solicitud y
+tramo cuántas cuotas están vencidas, su monto y su mora; así el total por
+tramo no depende del tamaño de la cartera.
+
+El resumen se mantiene así:
+    - rebuild_aging() lo reconstruye con una consulta agregada sobre las
+      cuotas no pagadas con atraso (la ejecuta accrue_late_fees después de
+      actualizar days_late cada noche); rebuild_application_aging() hace lo
+      mismo para una solicitud después de recalcular su cronograma.
+    - Las señales de PaymentSchedule llaman a move_contribution() con el
+      aporte anterior y el nuevo de la cuota (valores cargados, ver
+      core/tracking.py), de modo que un pago verificado lo descuenta al
+      instante.
+
+El tramo de una cuota depende de su days_late guardado, el mismo valor que
+usa el job nocturno.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+BUCKETS = [
+    # (tramo, desde, hasta) en días de atraso
+    ('1-30', 1, 30),
+    ('31-60', 31, 60),
+    ('61-90', 61, 90),
+    ('90+', 91, None),
+]
+
+
+def bucket_for(days_late):
+    for bucket, low, high in BUCKETS:
+        if days_late >= low and (high is None or days_late <= high):
+            return bucket
+    return None
+
+
+def _contribution(is_paid, days_late, amount, late_fee):
+    if is_paid or not days_late or days_late <= 0:
+        return None
+    return bucket_for(days_late), Decimal(str(amount or 0)), Decimal(str(late_fee or 0))
+
+
+def contribution(schedule):
+    """(tramo, monto, mora) con que una cuota suma al resumen, o None"""
+    return _contribution(schedule.is_paid, schedule.days_late, schedule.amount, schedule.late_fee)
+
+
+def loaded_contribution(schedule):
+    """Aporte de la cuota según los valores que tenía en la base de datos"""
+    return _contribution(
+        schedule.get_loaded_value('is_paid'),
+        schedule.get_loaded_value('days_late'),
+        schedule.get_loaded_value('amount'),
+        schedule.get_loaded_value('late_fee'),
+    )
+
+
+def move_contribution(application_id, old, new):
+    """Resta el aporte anterior de una cuota y suma el nuevo"""
+    from .models import DelinquencyBucket
+
+    if old == new:
+        return
+    rows = DelinquencyBucket.objects.filter(application_id=application_id)
+    if old is not None:
+        bucket, amount, late_fee = old
+        rows.filter(bucket=bucket).update(
+            installments=F('installments') - 1,
+            amount=F('amount') - amount,
+            late_fees=F('late_fees') - late_fee
+        )
+        rows.filter(bucket=bucket, installments__lte=0).delete()
+    if new is not None:
+        bucket, amount, late_fee = new
+        updated = rows.filter(bucket=bucket).update(
+            installments=F('installments') + 1,
+            amount=F('amount') + amount,
+            late_fees=F('late_fees') + late_fee
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    DelinquencyBucket.objects.create(
+                        application_id=application_id, bucket=bucket,
+                        installments=1, amount=amount, late_fees=late_fee
+                    )
+            except IntegrityError:
+                # Otro proceso creó el tramo al mismo tiempo
+                rows.filter(bucket=bucket).update(
+                    installments=F('installments') + 1,
+                    amount=F('amount') + amount,
+                    late_fees=F('late_fees') + late_fee
+                )
+
+
+def bucket_expression():
+    """CASE de SQL que asigna el tramo según days_late"""
+    return Case(
+        *[
+            When(
+                Q(days_late__gte=low) & (Q(days_late__lte=high) if high is not None else Q()),
+                then=Value(bucket)
+            )
+            for bucket, low, high in BUCKETS
+        ]
+    )
+
+
+def _summary_rows(schedules):
+    from .models import DelinquencyBucket
+
+    rows = (
+        schedules.filter(is_paid=False, days_late__gt=0)
+        .annotate(bucket=bucket_expression())
+        .values('application_id', 'bucket')
+        .annotate(installments=Count('id'), amount=Sum('amount'), late_fees=Sum('late_fee'))
+        .order_by()
+    )
+    return [
+        DelinquencyBucket(
+            application_id=row['application_id'],
+            bucket=row['bucket'],
+            installments=row['installments'],
+            amount=row['amount'],
+            late_fees=row['late_fees']
+        )
+        for row in rows
+    ]
+
+
+def rebuild_aging():
+    """Reconstruye el resumen completo; retorna el número de filas"""
+    from .models import DelinquencyBucket, PaymentSchedule
+
+    summary = _summary_rows(PaymentSchedule.objects.all())
+    with transaction.atomic():
+        DelinquencyBucket.objects.all().delete()
+        DelinquencyBucket.objects.bulk_create(summary, batch_size=1000)
+    return len(summary)
+
+
+def rebuild_application_aging(application_id):
+    """
+    Reconstruye el resumen de una solicitud (después de escrituras masivas
+    sobre sus cuotas, que no emiten señales)
+    """
+    from .models import DelinquencyBucket, PaymentSchedule
+
+    summary = _summary_rows(PaymentSchedule.objects.filter(application_id=application_id))
+    with transaction.atomic():
+        DelinquencyBucket.objects.filter(application_id=application_id).delete()
+        DelinquencyBucket.objects.bulk_create(summary)
+
+
+def aging_totals(application_id=None):
+    """Totales por tramo (en el orden de BUCKETS) leídos del resumen"""
+    from .models import DelinquencyBucket
+
+    rows = DelinquencyBucket.objects.all()
+    if application_id is not None:
+        rows = rows.filter(application_id=application_id)
+    found = {
+        row['bucket']: row
+        for row in rows.values('bucket').annotate(
+            applications=Count('application_id'),
+            installments=Sum('installments'),
+            amount=Sum('amount'),
+            late_fees=Sum('late_fees')
+        ).order_by()
+    }
+
+    labels = dict(DelinquencyBucket.BUCKETS)
+    totals = []
+    for bucket, _, _ in BUCKETS:
+        row = found.get(bucket, {})
+        totals.append({
+            'bucket': bucket,
+            'label': labels[bucket],
+            'applications': row.get('applications', 0),
+            'installments': row.get('installments') or 0,
+            'amount': Decimal(str(row.get('amount') or 0)).quantize(Decimal('0.01')),
+            'late_fees': Decimal(str(row.get('late_fees') or 0)).quantize(Decimal('0.01')),
+        })
+    return totals
@@ -0,0 +1,140 @@
+"""
+Asignación de números de solicitud (APP{año}{nnnnn}).
+
+Cada año tiene una fila en ApplicationNumberCounter con el último número
+entregado. Reservar números es un UPDATE atómico de esa fila (last_number +
+n), que la base de datos serializa con el bloqueo de fila: dos solicitudes
+simultáneas nunca reciben el mismo número y no hace falta recorrer las
+solicitudes existentes. La primera vez que se usa un año la fila se crea a
+partir del mayor número ya emitido.
+
+Con APPLICATION_NUMBER_BLOCK_SIZE > 1 cada proceso reserva bloques y los
+entrega desde memoria, así que sólo toca la fila una vez por bloque. Fuera
+de una transacción la reserva ya está confirmada y el bloque queda
+disponible para todo el proceso. Dentro de una transacción (por ejemplo, una
+importación masiva) el bloque queda pendiente en la conexión: las siguientes
+llamadas de la misma transacción lo usan, al confirmarse pasa a todo el
+proceso y, si se revierte, se descarta junto con la reserva. Los números no
+usados de un bloque (por ejemplo, al reiniciar el proceso) quedan como
+huecos en la numeración.
+"""
+import threading
+import weakref
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+PREFIX = "APP"
+BLOCK_SIZE = max(1, int(getattr(settings, 'APPLICATION_NUMBER_BLOCK_SIZE', 1)))
+
+_blocks = {}  # año -> [siguiente número, último número del bloque]
+_lock = threading.Lock()
+
+
+def _counter_model():
+    # Se resuelve en tiempo de ejecución porque financing.models importa este módulo
+    return apps.get_model('financing', 'ApplicationNumberCounter')
+
+
+def format_number(year, number):
+    return f"{PREFIX}{year}{number:05d}"
+
+
+def _highest_issued(year):
+    """Mayor número ya emitido en el año (sólo al crear la fila del contador)"""
+    FinancingRequest = apps.get_model('financing', 'FinancingRequest')
+    year_prefix = f"{PREFIX}{year}"
+    numbers = FinancingRequest.objects.filter(
+        application_number__startswith=year_prefix
+    ).values_list('application_number', flat=True)
+    return max((int(number[len(year_prefix):]) for number in numbers), default=0)
+
+
+def reserve(year, size=1):
+    """Reserva ``size`` números consecutivos del año; retorna el primero"""
+    Counter = _counter_model()
+    with transaction.atomic():
+        updated = Counter.objects.filter(year=year).update(last_number=F('last_number') + size)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    Counter.objects.create(year=year, last_number=_highest_issued(year) + size)
+            except IntegrityError:
+                # Otro proceso creó la fila al mismo tiempo
+                Counter.objects.filter(year=year).update(last_number=F('last_number') + size)
+        last_number = Counter.objects.filter(year=year).values_list('last_number', flat=True).get()
+    return last_number - size + 1
+
+
+class _PendingBlock:
+    """Bloque reservado dentro de una transacción aún sin confirmar"""
+
+    def __init__(self, year, first, last):
+        self.year = year
+        self.next = first
+        self.last = last
+
+    def take(self):
+        if self.next > self.last:
+            return None
+        number = self.next
+        self.next += 1
+        return number
+
+    def __call__(self):
+        # on_commit: el resto del bloque queda disponible para todo el proceso
+        if self.next <= self.last:
+            with _lock:
+                _blocks[self.year] = [self.next, self.last]
+        self.next = self.last + 1
+
+
+def _pending_block(connection, year):
+    """
+    Bloque pendiente de la transacción en curso, o None. La conexión guarda
+    sólo una referencia débil: la única referencia fuerte es el on_commit
+    registrado, que Django suelta al revertir la transacción o el savepoint
+    donde se reservó, y con él desaparece el bloque.
+    """
+    pending = getattr(connection, 'application_number_blocks', {})
+    ref = pending.get(year)
+    block = ref() if ref is not None else None
+    if block is None:
+        pending.pop(year, None)
+    return block
+
+
+def next_application_number(year=None):
+    """Siguiente número de solicitud del año (por defecto el actual)"""
+    year = year or timezone.now().year
+
+    with _lock:
+        block = _blocks.get(year)
+        if block and block[0] <= block[1]:
+            number = block[0]
+            block[0] += 1
+            return format_number(year, number)
+
+    connection = transaction.get_connection()
+    if BLOCK_SIZE > 1 and connection.in_atomic_block:
+        pending = _pending_block(connection, year)
+        number = pending.take() if pending is not None else None
+        if number is not None:
+            return format_number(year, number)
+
+    first = reserve(year, BLOCK_SIZE)
+    if BLOCK_SIZE > 1:
+        if connection.in_atomic_block:
+            pending = _PendingBlock(year, first + 1, first + BLOCK_SIZE - 1)
+            if not hasattr(connection, 'application_number_blocks'):
+                connection.application_number_blocks = {}
+            connection.application_number_blocks[year] = weakref.ref(pending)
+            transaction.on_commit(pending)
+        else:
+            # Sin transacción la reserva ya está confirmada
+            with _lock:
+                _blocks[year] = [first + 1, first + BLOCK_SIZE - 1]
+    return format_number(year, first)
@@ -0,0 +1,262 @@
+"""
+Subidas reanudables por fragmentos (comprobantes de pago y documentos).
+
+Protocolo (vistas en financing/views.py):
+    1. POST uploads/ con destino, nombre y tamaño: crea la subida.
+    2. PUT uploads/<id>/ con el encabezado Upload-Offset y los bytes del
+       fragmento en el cuerpo. El offset debe coincidir con los bytes ya
+       recibidos; si la conexión se corta, GET uploads/<id>/ indica desde
+       dónde continuar.
+    3. POST uploads/<id>/complete/: verifica el tamaño y el SHA-256 y
+       adjunta el archivo a Payment.receipt_file o al documento de la
+       solicitud.
+
+Los fragmentos se copian del cuerpo de la petición al archivo temporal en
+bloques pequeños, sin cargar el fragmento en memoria, y el SHA-256 se
+actualiza con cada bloque. El estado del hash vive en memoria del proceso;
+si el siguiente fragmento llega a otro worker, el hash se reconstruye
+leyendo una vez lo ya recibido. Al completar, el archivo temporal se mueve
+(no se copia) a su destino final porque está en el mismo MEDIA_ROOT.
+
+Configuración (settings):
+    - CHUNKED_UPLOAD_DIR: carpeta de temporales (MEDIA_ROOT/chunked_uploads).
+    - CHUNKED_UPLOAD_CHUNK_SIZE: tamaño máximo de un fragmento (1 MB).
+    - CHUNKED_UPLOAD_MAX_SIZE: tamaño máximo del archivo (20 MB).
+    - CHUNKED_UPLOAD_EXPIRE_HOURS: antigüedad para purgar subidas sin
+      terminar (24).
+"""
+import fcntl
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+# Bloque de lectura del cuerpo de la petición
+READ_BLOCK = 64 * 1024
+
+ALLOWED_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic')
+
+# Destinos de documentos de la solicitud (el resto es el comprobante de pago)
+DOCUMENT_TARGETS = ('income_proof', 'id_document', 'address_proof')
+
+# Hashes en curso por subida: id -> (bytes procesados, sha256)
+_hashers = OrderedDict()
+_MAX_HASHERS = 128
+
+
+class UploadError(Exception):
+    """Error del protocolo; ``offset`` indica desde dónde continuar si aplica"""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+def upload_dir():
+    return getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.MEDIA_ROOT, 'chunked_uploads'))
+
+
+def chunk_size():
+    return int(getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 1024 * 1024))
+
+
+def max_size():
+    return int(getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 20 * 1024 * 1024))
+
+
+def temp_path(upload):
+    return os.path.join(upload_dir(), f'{upload.pk}.part')
+
+
+def validate_new_upload(filename, size):
+    """Valida nombre y tamaño al crear la subida; lanza UploadError"""
+    if not filename or os.path.basename(filename) != filename:
+        raise UploadError('Nombre de archivo no válido')
+    if os.path.splitext(filename)[1].lower() not in ALLOWED_EXTENSIONS:
+        raise UploadError(f"Tipo de archivo no permitido ({', '.join(ALLOWED_EXTENSIONS)})")
+    if size <= 0 or size > max_size():
+        raise UploadError(f'El archivo debe pesar entre 1 byte y {max_size()} bytes')
+
+
+def _hasher_at(upload, offset):
+    """SHA-256 de los primeros ``offset`` bytes del archivo temporal"""
+    cached = _hashers.pop(upload.pk, None)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+
+    # Otro worker recibió los fragmentos anteriores: se rehace una vez
+    hasher = hashlib.sha256()
+    remaining = offset
+    try:
+        with open(temp_path(upload), 'rb') as handle:
+            while remaining:
+                block = handle.read(min(READ_BLOCK, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+    except FileNotFoundError:
+        pass
+    if remaining:
+        _restart(upload)
+        raise UploadError('Se perdió el archivo temporal; vuelva a subirlo', offset=0)
+    return hasher
+
+
+def _restart(upload):
+    """Vuelve la subida a cero cuando el archivo temporal no está completo"""
+    from .models import ChunkedUpload
+
+    ChunkedUpload.objects.filter(pk=upload.pk).update(offset=0, updated_at=timezone.now())
+    upload.offset = 0
+
+
+def _remember_hasher(upload, offset, hasher):
+    _hashers[upload.pk] = (offset, hasher)
+    while len(_hashers) > _MAX_HASHERS:
+        _hashers.popitem(last=False)
+
+
+def write_chunk(upload, offset, stream, length):
+    """
+    Agrega ``length`` bytes leídos de ``stream`` a partir de ``offset``.
+    Retorna el nuevo offset; si el cliente corta la conexión se guarda lo
+    recibido y el cliente continúa desde ahí.
+    """
+    from .models import ChunkedUpload
+
+    if upload.status != 'uploading':
+        raise UploadError('La subida ya fue completada')
+    if offset != upload.offset:
+        raise UploadError('El offset no coincide con los bytes recibidos', offset=upload.offset)
+    if length <= 0 or length > chunk_size():
+        raise UploadError(f'El fragmento debe pesar entre 1 byte y {chunk_size()} bytes')
+    if offset + length > upload.size:
+        raise UploadError('El fragmento excede el tamaño declarado del archivo', offset=upload.offset)
+
+    os.makedirs(upload_dir(), exist_ok=True)
+    path = temp_path(upload)
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Ya se está recibiendo un fragmento de esta subida', offset=upload.offset)
+
+        hasher = _hasher_at(upload, offset)
+        # Descarta bytes de un fragmento anterior que no llegó a registrarse
+        handle.seek(offset)
+        handle.truncate()
+
+        received = 0
+        while received < length:
+            block = stream.read(min(READ_BLOCK, length - received))
+            if not block:
+                break
+            handle.write(block)
+            hasher.update(block)
+            received += len(block)
+        handle.flush()
+
+        new_offset = offset + received
+        # Solo avanza si nadie más registró un fragmento entretanto
+        updated = ChunkedUpload.objects.filter(
+            pk=upload.pk, offset=offset, status='uploading'
+        ).update(offset=new_offset, updated_at=timezone.now())
+        if not updated:
+            _hashers.pop(upload.pk, None)
+            upload.refresh_from_db(fields=['offset', 'status'])
+            raise UploadError('La subida cambió mientras se recibía el fragmento', offset=upload.offset)
+
+    _remember_hasher(upload, new_offset, hasher)
+    upload.offset = new_offset
+    return new_offset
+
+
+def complete(upload):
+    """Verifica tamaño y hash y marca la subida como completa"""
+    if upload.status != 'uploading':
+        return
+    if upload.offset != upload.size:
+        raise UploadError('Faltan fragmentos por subir', offset=upload.offset)
+
+    digest = _hasher_at(upload, upload.offset).hexdigest()
+    _hashers.pop(upload.pk, None)
+    if upload.expected_sha256 and upload.expected_sha256.lower() != digest:
+        # El contenido recibido no es el del cliente: se empieza de nuevo
+        discard(upload, delete=False)
+        _restart(upload)
+        raise UploadError('El SHA-256 del archivo no coincide; vuelva a subirlo', offset=0)
+
+    upload.sha256 = digest
+    upload.status = 'complete'
+    upload.save(update_fields=['sha256', 'status', 'updated_at'])
+
+
+class UploadedParts(File):
+    """
+    Archivo temporal completo. FileSystemStorage mueve el archivo a su
+    destino cuando el contenido expone temporary_file_path().
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def attach(upload, instance=None):
+    """
+    Adjunta el archivo completo al campo de destino y guarda el objeto.
+    ``instance`` es el pago o la solicitud; por defecto el de la subida.
+    """
+    if upload.status != 'complete':
+        raise UploadError('La subida no está completa')
+    if instance is None:
+        instance = upload.application if upload.target in DOCUMENT_TARGETS else upload.payment
+    if instance is None:
+        raise UploadError('La subida no tiene un pago o solicitud asociada')
+
+    with open(temp_path(upload), 'rb') as handle:
+        getattr(instance, upload.target).save(upload.filename, UploadedParts(handle), save=False)
+    instance.save()
+
+    if upload.target in DOCUMENT_TARGETS:
+        upload.application = instance
+    else:
+        upload.payment = instance
+    upload.status = 'attached'
+    upload.save(update_fields=['application', 'payment', 'status', 'updated_at'])
+    discard(upload, delete=False)
+    return instance
+
+
+def discard(upload, delete=True):
+    """Borra el archivo temporal (y la subida si ``delete``)"""
+    _hashers.pop(upload.pk, None)
+    try:
+        os.remove(temp_path(upload))
+    except FileNotFoundError:
+        pass
+    if delete:
+        upload.delete()
+
+
+def purge_expired(older_than=None):
+    """
+    Elimina las subidas sin terminar, o terminadas y nunca adjuntadas, sin
+    actividad desde hace CHUNKED_UPLOAD_EXPIRE_HOURS. Retorna cuántas borró.
+    """
+    from .models import ChunkedUpload
+
+    if older_than is None:
+        older_than = timedelta(hours=int(getattr(settings, 'CHUNKED_UPLOAD_EXPIRE_HOURS', 24)))
+    expired = ChunkedUpload.objects.filter(
+        status__in=['uploading', 'complete'], updated_at__lt=timezone.now() - older_than
+    )
+    count = 0
+    for upload in expired.iterator():
+        discard(upload)
+        count += 1
+    return count
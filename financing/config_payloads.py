@@ -0,0 +1,197 @@
+"""
+Respuestas pre-serializadas de configuración del simulador, la calculadora y
+los métodos de pago.
+
+Cada carga de calculadora.html pide la configuración completa (opciones,
+modalidades, catálogo y textos de ayuda) y cada carga de realizar-pago.html
+los métodos de pago con sus cuentas; ambos sólo cambian cuando un
+administrador edita algo. La respuesta se arma con unas pocas consultas, se
+serializa una vez a JSON y se guarda en memoria junto con la versión de
+configuración compartida (ver financing/config_version.py). Mientras la
+versión no cambie, el endpoint devuelve los bytes guardados con sólo leer
+esa versión, con un ETag derivado del contenido para responder 304 a los
+clientes que ya lo tienen.
+"""
+import threading
+
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from core.conditional import make_etag
+from products.models import Product
+from .models import (
+    CalculatorMode, CompanyBankAccount, DownPaymentOption, FinancingConfiguration,
+    FinancingTerm, HelpText, PaymentFrequency, PaymentMethod
+)
+from .quote_cache import quote_cache
+
+_payloads = {}
+_lock = threading.Lock()
+
+
+def cached_payload(name, builder):
+    """
+    Retorna (JSON en bytes, ETag) del payload ``name``; ambos son None si el
+    constructor no produce datos. Se reconstruye sólo cuando cambia la
+    versión de configuración.
+    """
+    version = quote_cache.sync()
+    entry = _payloads.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1:]
+
+    payload = builder()
+    content = etag = None
+    if payload is not None:
+        content = JSONRenderer().render(payload)
+        etag = make_etag(content)
+    with _lock:
+        # Si la configuración cambió mientras se construía, no se guarda
+        if quote_cache.version == version:
+            _payloads[name] = (version, content, etag)
+    return content, etag
+
+
+def catalog_categories():
+    """Categorías con sus productos en stock, en una sola consulta"""
+    products = Product.objects.filter(stock__gt=0).order_by(
+        'category_id', '-featured', 'name'
+    ).values(
+        'id', 'name', 'price', 'description', 'brand',
+        'category_id', 'category__name', 'category__slug'
+    )
+
+    categories = []
+    for product in products:
+        if not categories or categories[-1]['id'] != product['category_id']:
+            categories.append({
+                'id': product['category_id'],
+                'name': product['category__name'],
+                'slug': product['category__slug'],
+                'products': []
+            })
+        categories[-1]['products'].append({
+            'id': product['id'],
+            'name': product['name'],
+            'price': product['price'],
+            'description': product['description'],
+            'brand': product['brand']
+        })
+    return categories
+
+
+def help_texts():
+    return {
+        help_text.section: {
+            'title': help_text.title,
+            'content': help_text.content
+        }
+        for help_text in HelpText.objects.filter(is_active=True).only('section', 'title', 'content')
+    }
+
+
+def build_simulator_config():
+    """Payload de SimulatorConfigurationView (None si no hay configuración activa)"""
+    config = FinancingConfiguration.objects.filter(is_active=True).prefetch_related(
+        Prefetch('down_payment_options', queryset=DownPaymentOption.objects.filter(is_active=True)),
+        Prefetch('financing_terms', queryset=FinancingTerm.objects.filter(is_active=True)),
+        Prefetch('payment_frequencies', queryset=PaymentFrequency.objects.filter(is_active=True)),
+    ).first()
+    if not config:
+        return None
+
+    return {
+        'down_payment_options': [
+            {'percentage': option.percentage, 'order': option.order}
+            for option in config.down_payment_options.all()
+        ],
+        'financing_terms': [
+            {'months': term.months, 'order': term.order}
+            for term in config.financing_terms.all()
+        ],
+        'payment_frequencies': [
+            {
+                'value': freq.frequency,
+                'label': freq.get_frequency_display(),
+                'order': freq.order
+            }
+            for freq in config.payment_frequencies.all()
+        ],
+        'categories': catalog_categories(),
+        'help_texts': help_texts()
+    }
+
+
+def build_calculator_config():
+    """Payload de CalculatorConfigurationView"""
+    modes_config = []
+    for mode in CalculatorMode.objects.filter(is_active=True).order_by('order'):
+        mode_data = {
+            'id': mode.id,
+            'name': mode.name,
+            'mode_type': mode.mode_type,
+            'description': mode.description,
+            'order': mode.order
+        }
+
+        if mode.mode_type == 'programada':
+            mode_data.update({
+                'adjudication_percentage': float(mode.adjudication_percentage),
+                'initial_fee_percentage': float(mode.initial_fee_percentage),
+                'min_initial_contribution': float(mode.min_initial_contribution),
+                'max_initial_contribution': float(mode.max_initial_contribution)
+            })
+        elif mode.mode_type == 'credito':
+            mode_data.update({
+                'down_payment_options': mode.get_down_payment_options(),
+                'term_options': mode.get_term_options(),
+                'interest_rate': float(mode.interest_rate)
+            })
+
+        modes_config.append(mode_data)
+
+    return {
+        'modes': modes_config,
+        'categories': catalog_categories()
+    }
+
+
+def build_payment_methods():
+    """Payload de PaymentMethodListView: métodos activos con sus cuentas activas"""
+    accounts = CompanyBankAccount.objects.filter(is_active=True)
+    methods = PaymentMethod.objects.filter(is_active=True).order_by('order').prefetch_related(
+        Prefetch('companybankaccount_set', queryset=accounts, to_attr='active_accounts')
+    )
+    account_types = dict(CompanyBankAccount._meta.get_field('account_type').flatchoices)
+
+    return {
+        'success': True,
+        'data': [
+            {
+                'id': method.id,
+                'name': method.name,
+                'payment_type': method.payment_type,
+                'description': method.description,
+                'instructions': method.instructions,
+                'requires_reference': method.requires_reference,
+                'requires_receipt': method.requires_receipt,
+                'min_amount': float(method.min_amount) if method.min_amount else None,
+                'max_amount': float(method.max_amount) if method.max_amount else None,
+                'processing_time_hours': method.processing_time_hours,
+                'accounts': [
+                    {
+                        'id': account.id,
+                        'bank_name': account.bank_name,
+                        'account_type': account_types.get(account.account_type, account.account_type),
+                        'account_number': account.account_number,
+                        'account_holder': account.account_holder,
+                        'currency': account.currency,
+                        'instructions': account.instructions,
+                        'is_default': account.is_default
+                    }
+                    for account in method.active_accounts
+                ]
+            }
+            for method in methods
+        ]
+    }
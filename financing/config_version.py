@@ -0,0 +1,63 @@
+"""
+Versión de configuración compartida entre workers.
+
+Producción corre varios workers de gunicorn, cada uno con sus propias
+cachés en memoria (cotizaciones, payloads de configuración). Cuando un
+administrador edita un precio o una tasa, la señal correspondiente sólo se
+ejecuta en el worker que atendió la edición; para que el resto se entere, la
+versión vive en una fila de la base de datos (ConfigVersion):
+
+    - bump() la incrementa de forma atómica dentro de la misma transacción
+      que el cambio, así que los demás workers la ven junto con los datos.
+    - current() la lee con una consulta por clave primaria. Con
+      CONFIG_VERSION_CHECK_INTERVAL > 0 la lectura se reutiliza durante esos
+      segundos (por defecto 0: se consulta en cada llamada).
+"""
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+VERSION_ROW_ID = 1
+CHECK_INTERVAL = getattr(settings, 'CONFIG_VERSION_CHECK_INTERVAL', 0)
+
+_last_read = (None, 0.0)  # (versión, momento de la lectura)
+
+
+def _model():
+    # El modelo se resuelve en tiempo de ejecución porque financing.models
+    # importa este módulo (a través de quote_cache) para sus señales
+    return apps.get_model('financing', 'ConfigVersion')
+
+
+def current():
+    """Versión vigente de la configuración"""
+    global _last_read
+    version, read_at = _last_read
+    now = time.monotonic()
+    if version is not None and CHECK_INTERVAL and now - read_at < CHECK_INTERVAL:
+        return version
+
+    version = _model().objects.filter(pk=VERSION_ROW_ID).values_list('version', flat=True).first() or 0
+    _last_read = (version, now)
+    return version
+
+
+def bump():
+    """Incrementa la versión; retorna la nueva"""
+    global _last_read
+    ConfigVersion = _model()
+    with transaction.atomic():
+        updated = ConfigVersion.objects.filter(pk=VERSION_ROW_ID).update(version=F('version') + 1)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    ConfigVersion.objects.create(pk=VERSION_ROW_ID, version=1)
+            except IntegrityError:
+                # Otro worker creó la fila al mismo tiempo
+                ConfigVersion.objects.filter(pk=VERSION_ROW_ID).update(version=F('version') + 1)
+        version = ConfigVersion.objects.filter(pk=VERSION_ROW_ID).values_list('version', flat=True).get()
+    _last_read = (version, time.monotonic())
+    return version
@@ -0,0 +1,291 @@
+"""
+Motor de amortización unificado para las calculadoras de financiamiento.
+
+Todas las vistas de cálculo (FinancingCalculatorView, SimulatorCalculateView y
+CalculatorCalculateView) delegan aquí para que una misma combinación de
+precio, inicial, plazo y frecuencia produzca siempre la misma cuota.
+
+Convención de periodos:
+    - La tasa por periodo es la tasa anual dividida entre los pagos por año
+      (52 semanal, 26 quincenal, 12 mensual).
+    - El número de cuotas es ``plazo_meses * pagos_por_año / 12`` redondeado
+      al entero más cercano (12 meses semanales = 52 cuotas).
+
+Los montos se manejan internamente en centavos enteros. Cada cuota se
+redondea al centavo y la última absorbe la diferencia de redondeo, de modo
+que la suma de las cuotas coincide exactamente con el total a pagar.
+
+Los lotes se calculan vectorizados con NumPy cuando está instalado; si no,
+se usa aritmética Decimal. En ambos casos los factores de descuento se
+toman de una tabla memorizada por (tasa, frecuencia, cuotas).
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+CENTS = Decimal('0.01')
+
+PERIODS_PER_YEAR = {
+    'weekly': 52,
+    'biweekly': 26,
+    'monthly': 12,
+}
+
+# Por debajo de este tamaño de lote el costo de crear arreglos NumPy supera
+# al cálculo escalar con factores memorizados
+VECTORIZE_MIN_BATCH = 16
+
+# Distancia (en centavos) a un empate de redondeo a partir de la cual el
+# resultado en punto flotante se considera ambiguo
+TIE_TOLERANCE = 1e-6
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Resultado de una cotización de financiamiento (montos en Decimal)"""
+    product_price: Decimal
+    down_payment_percentage: Decimal
+    down_payment_amount: Decimal
+    financed_amount: Decimal
+    annual_rate: Decimal
+    term_months: int
+    payment_frequency: str
+    number_of_payments: int
+    payment_amount: Decimal
+    last_payment_amount: Decimal
+    total_payments: Decimal
+    total_amount: Decimal
+    total_interest: Decimal
+
+    def installments(self):
+        """Montos de todas las cuotas; suman exactamente total_payments"""
+        if self.number_of_payments <= 0:
+            return []
+        return [self.payment_amount] * (self.number_of_payments - 1) + [self.last_payment_amount]
+
+
+def to_decimal(value):
+    """Convierte un valor numérico a Decimal sin pasar por la representación binaria"""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def to_cents(value):
+    """Redondea un monto a centavos (mitad hacia arriba)"""
+    return to_decimal(value).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def _round_half_up(value):
+    """Redondea un Decimal al entero más cercano (mitad hacia arriba)"""
+    return int(value.to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def get_periods_per_year(payment_frequency):
+    """Pagos por año según la frecuencia (mensual por defecto)"""
+    return PERIODS_PER_YEAR.get(payment_frequency, 12)
+
+
+def get_number_of_payments(term_months, payment_frequency):
+    """Número de cuotas para un plazo en meses y una frecuencia"""
+    periods_per_year = get_periods_per_year(payment_frequency)
+    return (int(term_months) * periods_per_year + 6) // 12
+
+
+@lru_cache(maxsize=4096)
+def discount_factors(annual_rate, periods_per_year, number_of_payments):
+    """
+    Factores de descuento memorizados por (tasa, frecuencia, cuotas).
+
+    Retorna, en Decimal:
+        - factor de anualidad r(1+r)^n / ((1+r)^n - 1)
+        - factor de capitalización (1+r)^n
+        - factor de acumulación ((1+r)^n - 1) / r
+
+    Las combinaciones posibles son pocas, así que la potencia Decimal se
+    calcula una sola vez por proceso.
+    """
+    n = number_of_payments
+    if n <= 0:
+        return Decimal('0'), Decimal('1'), Decimal('0')
+    if annual_rate == 0:
+        return Decimal('1') / n, Decimal('1'), Decimal(n)
+    period_rate = annual_rate / 100 / periods_per_year
+    growth = (1 + period_rate) ** n
+    return period_rate * growth / (growth - 1), growth, (growth - 1) / period_rate
+
+
+def _installment_cents_decimal(financed_cents, annual_rate, periods_per_year, number_of_payments):
+    """
+    Cuota regular y última cuota en centavos.
+
+    La última cuota es el saldo pendiente tras n-1 cuotas regulares más su
+    interés: F(1+r)^n - P(s_n - 1), donde s_n es el factor de acumulación.
+    """
+    if number_of_payments <= 0:
+        return 0, 0
+    factor, growth, accumulation = discount_factors(annual_rate, periods_per_year, number_of_payments)
+    payment = _round_half_up(financed_cents * factor)
+    last_payment = _round_half_up(financed_cents * growth - payment * (accumulation - 1))
+    return payment, last_payment
+
+
+def _installments_decimal(financed_cents, annual_rates, periods, counts):
+    return [
+        _installment_cents_decimal(financed, rate, ppy, count)
+        for financed, rate, ppy, count in zip(financed_cents, annual_rates, periods, counts)
+    ]
+
+
+def _installments_numpy(financed_cents, annual_rates, periods, counts):
+    keys = list(zip(annual_rates, periods, counts))
+    table = {key: [float(value) for value in discount_factors(*key)] for key in set(keys)}
+    factors = np.array([table[key] for key in keys], dtype=np.float64)
+    financed = np.array(financed_cents, dtype=np.float64)
+    active = np.array(counts) > 0
+
+    raw_payments = financed * factors[:, 0]
+    payments = np.floor(raw_payments + 0.5)
+    raw_last = financed * factors[:, 1] - payments * (factors[:, 2] - 1)
+    last_payments = np.where(active, np.floor(raw_last + 0.5), 0)
+
+    results = list(zip(payments.astype(np.int64).tolist(), last_payments.astype(np.int64).tolist()))
+
+    # Los valores a un pelo de medio centavo se recalculan en Decimal para que
+    # ambas rutas coincidan exactamente
+    ties = (
+        (np.abs(raw_payments - np.floor(raw_payments) - 0.5) < TIE_TOLERANCE)
+        | (np.abs(raw_last - np.floor(raw_last) - 0.5) < TIE_TOLERANCE)
+    )
+    for i in np.nonzero(ties & active)[0]:
+        results[i] = _installment_cents_decimal(financed_cents[i], *keys[i])
+    return results
+
+
+def _broadcast(values, size):
+    """Expande un escalar a una lista del tamaño del lote"""
+    if isinstance(values, (list, tuple)):
+        if len(values) != size:
+            raise ValueError('Todos los parámetros del lote deben tener el mismo tamaño')
+        return list(values)
+    return [values] * size
+
+
+def _batch_size(*columns):
+    sizes = {len(column) for column in columns if isinstance(column, (list, tuple))}
+    if len(sizes) > 1:
+        raise ValueError('Todos los parámetros del lote deben tener el mismo tamaño')
+    return sizes.pop() if sizes else 1
+
+
+def calculate_quotes(product_prices, down_payment_percentages, term_months,
+                     payment_frequencies='monthly', annual_rates=0, vectorize=None):
+    """
+    Calcula un lote de cotizaciones.
+
+    Cada parámetro puede ser una lista (una entrada por cotización) o un
+    escalar que se aplica a todo el lote. Retorna una lista de ``Quote`` en
+    el mismo orden de entrada.
+    """
+    size = _batch_size(product_prices, down_payment_percentages, term_months,
+                       payment_frequencies, annual_rates)
+    price_cents = [_round_half_up(to_decimal(value) * 100) for value in _broadcast(product_prices, size)]
+    percentages = [to_decimal(value) for value in _broadcast(down_payment_percentages, size)]
+    terms = [int(value) for value in _broadcast(term_months, size)]
+    frequencies = _broadcast(payment_frequencies, size)
+    rates = [to_decimal(value) for value in _broadcast(annual_rates, size)]
+
+    down_cents = [_round_half_up(price * pct / 100) for price, pct in zip(price_cents, percentages)]
+    financed_cents = [price - down for price, down in zip(price_cents, down_cents)]
+    periods = [get_periods_per_year(freq) for freq in frequencies]
+    counts = [get_number_of_payments(term, freq) for term, freq in zip(terms, frequencies)]
+
+    if vectorize is None:
+        vectorize = np is not None and size >= VECTORIZE_MIN_BATCH
+    if vectorize and np is not None:
+        installments = _installments_numpy(financed_cents, rates, periods, counts)
+    else:
+        installments = _installments_decimal(financed_cents, rates, periods, counts)
+
+    quotes = []
+    for i, (payment, last_payment) in enumerate(installments):
+        total_payments = payment * (counts[i] - 1) + last_payment if counts[i] > 0 else 0
+        total_amount = down_cents[i] + total_payments
+        quotes.append(Quote(
+            product_price=_from_cents(price_cents[i]),
+            down_payment_percentage=percentages[i],
+            down_payment_amount=_from_cents(down_cents[i]),
+            financed_amount=_from_cents(financed_cents[i]),
+            annual_rate=rates[i],
+            term_months=terms[i],
+            payment_frequency=frequencies[i],
+            number_of_payments=counts[i],
+            payment_amount=_from_cents(payment),
+            last_payment_amount=_from_cents(last_payment),
+            total_payments=_from_cents(total_payments),
+            total_amount=_from_cents(total_amount),
+            total_interest=_from_cents(total_amount - price_cents[i]),
+        ))
+    return quotes
+
+
+def calculate_grid(product_price, down_payment_percentages, term_months,
+                   payment_frequencies=None, annual_rate=0):
+    """
+    Calcula todas las combinaciones inicial × plazo × frecuencia para un precio.
+
+    Retorna las cotizaciones en orden (inicial, plazo, frecuencia), calculadas
+    en un solo lote.
+    """
+    if payment_frequencies is None:
+        payment_frequencies = list(PERIODS_PER_YEAR)
+    combinations = [
+        (percentage, term, frequency)
+        for percentage in down_payment_percentages
+        for term in term_months
+        for frequency in payment_frequencies
+    ]
+    if not combinations:
+        return []
+    percentages, terms, frequencies = (list(column) for column in zip(*combinations))
+    return calculate_quotes(product_price, percentages, terms, frequencies, annual_rate)
+
+
+def calculate_quote(product_price, down_payment_percentage, term_months,
+                    payment_frequency='monthly', annual_rate=0):
+    """Calcula una cotización individual"""
+    return calculate_quotes(
+        [product_price], [down_payment_percentage], [term_months],
+        [payment_frequency], [annual_rate], vectorize=False
+    )[0]
+
+
+def split_installments(total, number_of_payments, payment_amount=None):
+    """
+    Reparte un total en cuotas al centavo que suman exactamente el total.
+
+    Si se indica payment_amount, las primeras n-1 cuotas usan ese monto y la
+    última absorbe la diferencia; si no, el total se reparte en partes iguales
+    y los centavos sobrantes van a la última cuota.
+    """
+    if number_of_payments <= 0:
+        return []
+    total_cents = _round_half_up(to_decimal(total) * 100)
+    if payment_amount is not None:
+        payment_cents = _round_half_up(to_decimal(payment_amount) * 100)
+        last_cents = total_cents - payment_cents * (number_of_payments - 1)
+        if payment_cents > 0 and last_cents > 0:
+            return [_from_cents(payment_cents)] * (number_of_payments - 1) + [_from_cents(last_cents)]
+    payment_cents = total_cents // number_of_payments
+    last_cents = total_cents - payment_cents * (number_of_payments - 1)
+    return [_from_cents(payment_cents)] * (number_of_payments - 1) + [_from_cents(last_cents)]
@@ -0,0 +1,156 @@
+"""
+Pronóstico probabilístico de adjudicación para Compra Programada.
+
+La calculadora estima una sola fecha de adjudicación suponiendo que el
+cliente paga todos los meses con la misma puntualidad. Aquí se simulan miles
+de trayectorias de pago en las que cada mes el aporte puede llegar a tiempo,
+con atraso o no llegar, y se reportan los percentiles P10/P50/P90 de los
+meses hasta la adjudicación.
+
+Reglas de la simulación (las mismas de la calculadora):
+    - Se adjudica cuando se acumulan tantos aportes pagados como meses hacen
+      falta para cubrir el monto hasta adjudicación.
+    - Un pago puntual suma 3 puntos y uno atrasado 1; cada 10 puntos
+      adelantan un mes la adjudicación (mínimo 1 mes).
+
+El resultado sólo depende de los meses necesarios y del perfil de
+puntualidad, así que se memoriza por esa combinación: cualquier precio,
+aporte inicial y cuota mensual que lleven al mismo número de meses reutiliza
+la misma simulación. La semilla es fija para que el pronóstico sea estable
+entre solicitudes y procesos.
+
+El endpoint es público, así que el trabajo está acotado: no se pronostican
+más de MAX_MONTHS meses y, sin NumPy, el número de simulaciones se reduce
+para no recorrer más de PYTHON_MAX_STEPS meses simulados en total (unos
+pocos milisegundos). Como la memoria cubre todas las combinaciones posibles
+(MAX_MONTHS × perfiles), cada una se simula a lo sumo una vez por proceso.
+"""
+import random
+from functools import lru_cache
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+# Probabilidad mensual de (pago puntual, pago atrasado, pago omitido)
+PUNCTUALITY_PROFILES = getattr(settings, 'PROGRAMADA_PUNCTUALITY_PROFILES', {
+    'always': (0.95, 0.04, 0.01),
+    'mostly': (0.80, 0.15, 0.05),
+    'sometimes': (0.55, 0.30, 0.15),
+})
+
+ON_TIME_POINTS = 3
+LATE_POINTS = 1
+POINTS_PER_MONTH_REDUCTION = 10
+
+SIMULATIONS = getattr(settings, 'PROGRAMADA_FORECAST_SIMULATIONS', 2000)
+SEED = 20240101
+
+# Límites de trabajo por pronóstico
+MAX_MONTHS = getattr(settings, 'PROGRAMADA_FORECAST_MAX_MONTHS', 120)
+PYTHON_MAX_STEPS = getattr(settings, 'PROGRAMADA_FORECAST_PYTHON_MAX_STEPS', 40000)
+PYTHON_MIN_SIMULATIONS = 200
+
+PERCENTILES = (10, 50, 90)
+
+
+def _percentile(sorted_values, percentile):
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    index = int(round(percentile / 100 * (len(sorted_values) - 1)))
+    return int(sorted_values[index])
+
+
+def _simulate_numpy(months_needed, profile, simulations):
+    """
+    Versión vectorizada: en lugar de recorrer cada mes se muestrea
+    directamente la distribución exacta de cada trayectoria.
+
+    - Los meses omitidos antes del k-ésimo pago siguen una binomial negativa.
+    - De los k pagos, los puntuales siguen una binomial.
+    """
+    on_time, late, missed = profile
+    rng = np.random.default_rng(SEED)
+
+    missed_months = rng.negative_binomial(months_needed, 1 - missed, size=simulations) if missed > 0 else 0
+    on_time_payments = rng.binomial(months_needed, on_time / (on_time + late), size=simulations)
+
+    months = months_needed + missed_months
+    points = on_time_payments * ON_TIME_POINTS + (months_needed - on_time_payments) * LATE_POINTS
+
+    final_months = np.maximum(1, months - points // POINTS_PER_MONTH_REDUCTION)
+    return np.sort(final_months).tolist()
+
+
+def _simulate_python(months_needed, profile, simulations):
+    """Versión sin NumPy: recorre mes a mes cada trayectoria"""
+    on_time, late, missed = profile
+    rng = random.Random(SEED)
+
+    final_months = []
+    for _ in range(simulations):
+        month = 0
+        paid_count = 0
+        points = 0
+        while paid_count < months_needed:
+            month += 1
+            draw = rng.random()
+            if draw >= missed:
+                paid_count += 1
+                points += ON_TIME_POINTS if draw >= missed + late else LATE_POINTS
+        final_months.append(max(1, month - points // POINTS_PER_MONTH_REDUCTION))
+    final_months.sort()
+    return final_months
+
+
+def python_simulations(months_needed, profile, simulations):
+    """Simulaciones que caben en PYTHON_MAX_STEPS meses simulados sin NumPy"""
+    expected_months = months_needed / (1 - profile[2])
+    budget = int(PYTHON_MAX_STEPS // expected_months)
+    return min(simulations, max(PYTHON_MIN_SIMULATIONS, budget))
+
+
+def forecast_adjudication(months_needed, punctuality='always', simulations=SIMULATIONS):
+    """
+    Simula los meses hasta la adjudicación.
+
+    Retorna un diccionario con los percentiles P10/P50/P90 (en meses), la
+    media y el número de simulaciones, o None si los meses necesarios
+    superan MAX_MONTHS.
+    """
+    months_needed = int(months_needed)
+    if months_needed > MAX_MONTHS:
+        return None
+    # Un perfil desconocido se trata como 'sometimes' (sin entradas extra en la memoria)
+    if punctuality not in PUNCTUALITY_PROFILES:
+        punctuality = 'sometimes'
+    return _forecast(max(months_needed, 0), punctuality, simulations)
+
+
+@lru_cache(maxsize=1024)
+def _forecast(months_needed, punctuality, simulations):
+    if months_needed <= 0:
+        return {
+            'simulations': 0,
+            'mean_months': 1.0,
+            **{f'p{percentile}_months': 1 for percentile in PERCENTILES}
+        }
+
+    profile = PUNCTUALITY_PROFILES[punctuality]
+    if np is not None:
+        final_months = _simulate_numpy(months_needed, profile, simulations)
+    else:
+        simulations = python_simulations(months_needed, profile, simulations)
+        final_months = _simulate_python(months_needed, profile, simulations)
+
+    return {
+        'simulations': simulations,
+        'mean_months': round(sum(final_months) / len(final_months), 2),
+        **{
+            f'p{percentile}_months': _percentile(final_months, percentile)
+            for percentile in PERCENTILES
+        }
+    }
@@ -0,0 +1,118 @@
+"""
+Corpus de valores de referencia del motor de amortización.
+
+El corpus guarda miles de pares entrada/salida de ``calculate_quotes`` para
+demostrar que una optimización del motor produce exactamente los mismos
+montos. Las entradas se generan con una semilla fija e incluyen casos
+límite (tasa cero, un solo pago, medios centavos exactos); las salidas se
+guardan como cadenas decimales para compararlas sin pérdida.
+
+    python manage.py benchmark_calculators --update-golden   # regenerar
+    python manage.py benchmark_calculators                   # verificar
+    python manage.py test financing                          # verificar (pruebas)
+"""
+import json
+import os
+import random
+
+from .engine import PERIODS_PER_YEAR, calculate_quotes
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'benchmarks', 'golden_quotes.json')
+GOLDEN_SEED = 20240601
+GOLDEN_SIZE = 4000
+
+INPUT_FIELDS = (
+    'product_price', 'down_payment_percentage', 'term_months',
+    'payment_frequency', 'annual_rate'
+)
+OUTPUT_FIELDS = (
+    'down_payment_amount', 'financed_amount', 'number_of_payments',
+    'payment_amount', 'last_payment_amount', 'total_payments',
+    'total_amount', 'total_interest'
+)
+
+# Precios que producen medios centavos exactos o montos muy pequeños/grandes
+EDGE_PRICES = ['0.01', '1.00', '742.50', '999.99', '1500.00', '2999.99', '5450.50', '99999.99']
+EDGE_RATES = ['0', '0.01', '12', '15.5', '99.99']
+
+
+def generate_cases(size=GOLDEN_SIZE, seed=GOLDEN_SEED):
+    """Entradas del corpus como tuplas de cadenas/enteros en el orden de INPUT_FIELDS"""
+    rng = random.Random(seed)
+    frequencies = list(PERIODS_PER_YEAR)
+    cases = []
+
+    # Casos límite: todas las combinaciones de precio y tasa
+    for price in EDGE_PRICES:
+        for rate in EDGE_RATES:
+            for frequency in frequencies:
+                cases.append((price, '30', 12, frequency, rate))
+                cases.append((price, '0', 1, frequency, rate))
+                cases.append((price, '100', 6, frequency, rate))
+
+    while len(cases) < size:
+        cases.append((
+            f'{rng.randint(100, 5000000) / 100:.2f}',
+            rng.choice(['0', '10', '15', '20', '25', '30', '40', '50', '60', '15.5', '33.33']),
+            rng.choice([1, 3, 6, 9, 12, 18, 24, 30, 36, 48, 60]),
+            rng.choice(frequencies),
+            rng.choice(['0', '8', '12', '15', '18.5', '24', '36', '0.75']),
+        ))
+    return cases[:size]
+
+
+def quote_outputs(quote):
+    """Salidas de una cotización en el orden de OUTPUT_FIELDS"""
+    return [
+        value if isinstance(value, int) else str(value)
+        for value in (getattr(quote, field) for field in OUTPUT_FIELDS)
+    ]
+
+
+def build_corpus(size=GOLDEN_SIZE, seed=GOLDEN_SEED):
+    """Calcula el corpus con el motor actual (ruta Decimal)"""
+    cases = generate_cases(size, seed)
+    quotes = calculate_quotes(*(list(column) for column in zip(*cases)), vectorize=False)
+    return {
+        'seed': seed,
+        'inputs': list(INPUT_FIELDS),
+        'outputs': list(OUTPUT_FIELDS),
+        'cases': [list(case) + quote_outputs(quote) for case, quote in zip(cases, quotes)],
+    }
+
+
+def write_corpus(corpus, path=GOLDEN_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write('{\n')
+        handle.write(f'  "seed": {corpus["seed"]},\n')
+        handle.write(f'  "inputs": {json.dumps(corpus["inputs"])},\n')
+        handle.write(f'  "outputs": {json.dumps(corpus["outputs"])},\n')
+        handle.write('  "cases": [\n')
+        # Una línea por caso para que los diffs sean legibles
+        handle.write(',\n'.join(f'    {json.dumps(case)}' for case in corpus['cases']))
+        handle.write('\n  ]\n}\n')
+
+
+def load_corpus(path=GOLDEN_PATH):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def check_corpus(corpus, vectorize=None):
+    """
+    Recalcula el corpus y retorna la lista de diferencias como tuplas
+    (índice, entradas, esperado, obtenido).
+    """
+    size = len(corpus['inputs'])
+    cases = corpus['cases']
+    inputs = [case[:size] for case in cases]
+    quotes = calculate_quotes(*(list(column) for column in zip(*inputs)), vectorize=vectorize)
+
+    mismatches = []
+    for index, (case, quote) in enumerate(zip(cases, quotes)):
+        expected = case[size:]
+        actual = quote_outputs(quote)
+        if expected != actual:
+            mismatches.append((index, case[:size], expected, actual))
+    return mismatches
@@ -0,0 +1,125 @@
+"""
+Cálculo de mora de las cuotas programadas.
+
+Regla (configurable en settings):
+    - LATE_FEE_GRACE_DAYS: días de gracia después del vencimiento (0).
+    - LATE_FEE_PERIOD_DAYS: cada cuántos días de atraso se cobra un periodo (7).
+    - LATE_FEE_RATE: fracción del monto de la cuota por periodo ('0.01' = 1%).
+    - LATE_FEE_MAX_RATE: tope de la mora como fracción del monto (None = sin tope).
+
+    mora = monto × min(tasa × periodos, tope), redondeada al centavo,
+    con periodos = (días de atraso − gracia) // días por periodo.
+
+PaymentSchedule.calculate_late_fee aplica la regla a una cuota en Decimal.
+accrue_late_fees la aplica a todas las cuotas vencidas en una sola sentencia
+UPDATE: el atraso se calcula en SQL con DaysSince y la mora con la misma
+aritmética (la división entera de días entre periodo coincide con la de
+Python porque ambos operandos son enteros no negativos). Al terminar se
+reconstruye el resumen de morosidad (financing/aging.py).
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateField, DecimalField, ExpressionWrapper, F, Func, IntegerField, Q, Value
+from django.db.models.functions import Greatest, Least, Round
+from django.utils import timezone
+
+CENTS = Decimal('0.01')
+
+
+class DaysSince(Func):
+    """Días enteros transcurridos desde la fecha de ``expression`` hasta ``as_of``"""
+    output_field = IntegerField()
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+
+    def __init__(self, expression, as_of, **extra):
+        super().__init__(Value(as_of, output_field=DateField()), expression, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='DATEDIFF', template='%(function)s(%(expressions)s)', arg_joiner=', ', **extra_context)
+
+
+def late_fee_rule():
+    """(gracia, días por periodo, tasa por periodo, tope) según settings"""
+    max_rate = getattr(settings, 'LATE_FEE_MAX_RATE', None)
+    return (
+        int(getattr(settings, 'LATE_FEE_GRACE_DAYS', 0)),
+        max(1, int(getattr(settings, 'LATE_FEE_PERIOD_DAYS', 7))),
+        Decimal(str(getattr(settings, 'LATE_FEE_RATE', '0.01'))),
+        Decimal(str(max_rate)) if max_rate is not None else None,
+    )
+
+
+def late_fee_factor(days_late, rule=None):
+    """Fracción del monto de la cuota que corresponde a ``days_late`` días de atraso"""
+    grace, period_days, rate, max_rate = rule or late_fee_rule()
+    periods = max(days_late - grace, 0) // period_days
+    factor = rate * periods
+    if max_rate is not None:
+        factor = min(factor, max_rate)
+    return factor
+
+
+def late_fee_amount(amount, days_late, rule=None):
+    return (Decimal(amount) * late_fee_factor(days_late, rule)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def accrue_late_fees(as_of=None, applications=None):
+    """
+    Actualiza days_late y late_fee de todas las cuotas. Retorna
+    (cuotas vencidas actualizadas, cuotas puestas al día).
+    """
+    from .aging import rebuild_aging
+    from .models import PaymentSchedule
+    from .virtual_schedule import materialize_overdue
+
+    as_of = as_of or timezone.now().date()
+    schedules = PaymentSchedule.objects.all()
+    if applications is not None:
+        schedules = schedules.filter(application__in=applications)
+
+    # Las cuotas virtuales vencidas se guardan para poder cobrarles mora
+    materialize_overdue(applications, as_of)
+
+    grace, period_days, rate, max_rate = late_fee_rule()
+    days_late = DaysSince('due_date', as_of)
+    periods = ExpressionWrapper(
+        Greatest(days_late - Value(grace), Value(0)) / Value(period_days),
+        output_field=IntegerField()
+    )
+    factor = ExpressionWrapper(periods * Value(rate), output_field=DecimalField(max_digits=12, decimal_places=6))
+    if max_rate is not None:
+        factor = Least(factor, Value(max_rate), output_field=DecimalField(max_digits=12, decimal_places=6))
+
+    with transaction.atomic():
+        accrued = schedules.filter(is_paid=False, due_date__lt=as_of).update(
+            days_late=days_late,
+            late_fee=Round(
+                ExpressionWrapper(F('amount') * factor, output_field=DecimalField(max_digits=12, decimal_places=6)),
+                2
+            )
+        )
+
+        # Cuotas pagadas o aún no vencidas que arrastran atraso o mora
+        cleared = schedules.filter(
+            Q(is_paid=True) | Q(due_date__gte=as_of)
+        ).filter(
+            Q(days_late__gt=0) | Q(late_fee__gt=0)
+        ).update(days_late=0, late_fee=0)
+
+        # Los UPDATE masivos no emiten señales: el resumen de morosidad se
+        # reconstruye con los atrasos recién calculados
+        rebuild_aging()
+
+    return accrued, cleared
+
@@ -0,0 +1,217 @@
+"""
+Simulador de liquidez del fondo de Compra Programada.
+
+Las adjudicaciones de Compra Programada se pagan con los aportes de todos
+los contratos del fondo. El simulador carga los contratos vigentes y sus
+cuotas pendientes en arreglos compactos y proyecta mes a mes:
+
+    1. Ingresan al fondo las cuotas que vencen en el mes (por la tasa de
+       cobranza esperada). Las cuotas vencidas antes de hoy se cobran en el
+       primer mes.
+    2. Un contrato queda elegible cuando sus aportes acumulados (inicial más
+       cuotas pagadas) alcanzan el porcentaje de adjudicación de la modalidad.
+    3. Los elegibles se adjudican por antigüedad mientras el saldo del fondo
+       alcance para pagar el valor del vehículo.
+
+Se consideran contratos de Compra Programada las solicitudes aprobadas o
+activas cuyo plan tiene 'programada' en el slug; las activas se toman como
+ya adjudicadas (sus cuotas siguen ingresando al fondo). El saldo inicial por
+defecto son los aportes de los contratos aún no adjudicados.
+"""
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import CalculatorMode, FinancingRequest, PaymentSchedule
+from .virtual_schedule import pending_by_month, virtual_schedules_enabled
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+
+PROGRAMADA_PLAN_KEYWORD = getattr(settings, 'PROGRAMADA_PLAN_KEYWORD', 'programada')
+PENDING_STATUS = 'approved'
+ADJUDICATED_STATUS = 'active'
+DEFAULT_MONTHS = 24
+
+
+class ContractPool:
+    """Contratos del fondo en arreglos paralelos (una posición por contrato)"""
+
+    def __init__(self, start, months, ids, prices, thresholds, contributions, adjudicated, inflows):
+        self.start = start
+        self.months = months
+        self.ids = ids
+        self.prices = prices                # valor del vehículo
+        self.thresholds = thresholds        # aporte necesario para adjudicar
+        self.contributions = contributions  # aportes acumulados a hoy
+        self.adjudicated = adjudicated      # ya adjudicado (bool)
+        self.inflows = inflows              # cuotas por mes, contratos × meses
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def programada_contracts():
+    """Solicitudes vigentes de Compra Programada"""
+    return FinancingRequest.objects.filter(
+        financing_plan__slug__icontains=PROGRAMADA_PLAN_KEYWORD,
+        status__in=[PENDING_STATUS, ADJUDICATED_STATUS]
+    )
+
+
+def load_pool(months=DEFAULT_MONTHS, start=None):
+    """
+    Carga el fondo con tres consultas agregadas: contratos, aportes pagados
+    y cuotas pendientes agrupadas por mes de vencimiento.
+    """
+    start = (start or timezone.localdate()).replace(day=1)
+    end = start + relativedelta(months=months)
+
+    mode = CalculatorMode.objects.filter(mode_type='programada').first()
+    adjudication_percentage = mode.adjudication_percentage if mode else Decimal('45.00')
+
+    contracts = list(
+        programada_contracts().order_by('id').values_list(
+            'id', 'product_price', 'down_payment_amount', 'status'
+        )
+    )
+    index = {contract[0]: position for position, contract in enumerate(contracts)}
+    size = len(contracts)
+
+    paid = dict(
+        PaymentSchedule.objects.filter(application_id__in=index, is_paid=True)
+        .values_list('application_id')
+        .annotate(total=Sum('paid_amount', default=0) + Sum('amount', filter=Q(paid_amount__isnull=True), default=0))
+    )
+    if virtual_schedules_enabled():
+        # Las cuotas sin guardar se calculan a partir de cada contrato
+        pending = pending_by_month(programada_contracts().filter(id__in=index), end)
+    else:
+        pending = (
+            PaymentSchedule.objects.filter(application_id__in=index, is_paid=False, due_date__lt=end)
+            .annotate(month=TruncMonth('due_date'))
+            .values_list('application_id', 'month')
+            .annotate(total=Sum('amount'))
+        )
+
+    ids = [contract[0] for contract in contracts]
+    prices = [float(contract[1]) for contract in contracts]
+    thresholds = [float(contract[1] * adjudication_percentage / 100) for contract in contracts]
+    contributions = [float(contract[2] + paid.get(contract[0], 0)) for contract in contracts]
+    adjudicated = [contract[3] == ADJUDICATED_STATUS for contract in contracts]
+
+    rows, columns, amounts = [], [], []
+    for application_id, month, total in pending:
+        offset = (month.year - start.year) * 12 + month.month - start.month
+        rows.append(index[application_id])
+        columns.append(min(max(offset, 0), months - 1))
+        amounts.append(float(total))
+
+    if np is not None:
+        inflows = np.zeros((size, months))
+        np.add.at(inflows, (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)), amounts)
+        return ContractPool(
+            start, months, np.array(ids, dtype=np.int64), np.array(prices), np.array(thresholds),
+            np.array(contributions), np.array(adjudicated, dtype=bool), inflows
+        )
+
+    inflows = [[0.0] * months for _ in range(size)]
+    for row, column, amount in zip(rows, columns, amounts):
+        inflows[row][column] += amount
+    return ContractPool(start, months, ids, prices, thresholds, contributions, adjudicated, inflows)
+
+
+def _month_result(pool, month, inflow, adjudications, payout, balance, pending, eligible):
+    return {
+        'month': pool.start + relativedelta(months=month),
+        'inflow': round(inflow, 2),
+        'adjudications': adjudications,
+        'payout': round(payout, 2),
+        'balance': round(balance, 2),
+        'eligible_waiting': eligible,
+        'pending_contracts': pending,
+    }
+
+
+def _simulate_numpy(pool, collection_rate, balance):
+    adjudicated = pool.adjudicated.copy()
+    cumulative = pool.contributions + np.cumsum(pool.inflows * collection_rate, axis=1).T
+    monthly_inflow = pool.inflows.sum(axis=0) * collection_rate
+
+    results = []
+    for month in range(pool.months):
+        balance += monthly_inflow[month]
+
+        # Los contratos están ordenados por id, así que los elegibles salen
+        # en orden de antigüedad
+        candidates = np.nonzero(~adjudicated & (cumulative[month] >= pool.thresholds))[0]
+        costs = np.cumsum(pool.prices[candidates])
+        funded = int(np.searchsorted(costs, balance, side='right'))
+        payout = float(costs[funded - 1]) if funded else 0.0
+
+        adjudicated[candidates[:funded]] = True
+        balance -= payout
+        results.append(_month_result(
+            pool, month, float(monthly_inflow[month]), funded, payout, float(balance),
+            int((~adjudicated).sum()), len(candidates) - funded
+        ))
+    return results
+
+
+def _simulate_python(pool, collection_rate, balance):
+    adjudicated = list(pool.adjudicated)
+    cumulative = list(pool.contributions)
+
+    results = []
+    for month in range(pool.months):
+        inflow = 0.0
+        for position, row in enumerate(pool.inflows):
+            collected = row[month] * collection_rate
+            cumulative[position] += collected
+            inflow += collected
+        balance += inflow
+
+        candidates = [
+            position for position in range(len(pool))
+            if not adjudicated[position] and cumulative[position] >= pool.thresholds[position]
+        ]
+        funded = 0
+        payout = 0.0
+        for position in candidates:
+            if payout + pool.prices[position] > balance:
+                break
+            payout += pool.prices[position]
+            adjudicated[position] = True
+            funded += 1
+
+        balance -= payout
+        results.append(_month_result(
+            pool, month, inflow, funded, payout, balance,
+            adjudicated.count(False), len(candidates) - funded
+        ))
+    return results
+
+
+def simulate_pool(pool, collection_rate=1.0, initial_balance=None):
+    """
+    Proyecta el fondo mes a mes.
+
+    Retorna una lista de diccionarios por mes con ingresos, adjudicaciones
+    financiadas, pagos, saldo, elegibles en espera y contratos pendientes.
+    """
+    if initial_balance is None:
+        initial_balance = sum(
+            contribution
+            for contribution, adjudicated in zip(pool.contributions, pool.adjudicated)
+            if not adjudicated
+        )
+    if np is not None and isinstance(pool.prices, np.ndarray):
+        return _simulate_numpy(pool, collection_rate, float(initial_balance))
+    return _simulate_python(pool, collection_rate, float(initial_balance))
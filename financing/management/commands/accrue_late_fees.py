@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q, Sum
+
+from financing.late_fees import accrue_late_fees, late_fee_rule
+from financing.models import PaymentSchedule
+
+class Command(BaseCommand):
+    help = 'Actualiza días de atraso y cargos por mora de las cuotas programadas (tarea nocturna)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Fecha de corte AAAA-MM-DD (por defecto hoy)',
+        )
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options['date']:
+            try:
+                as_of = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('La fecha debe tener el formato AAAA-MM-DD')
+
+        grace, period_days, rate, max_rate = late_fee_rule()
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Calculando mora de cuotas programadas...')
+        )
+        self.stdout.write(
+            f"📋 Regla: {rate * 100}% cada {period_days} días, {grace} días de gracia"
+            + (f", tope {max_rate * 100}%" if max_rate is not None else "")
+        )
+
+        accrued, cleared = accrue_late_fees(as_of)
+
+        totals = PaymentSchedule.objects.filter(is_paid=False).aggregate(
+            overdue=Count('id', filter=Q(days_late__gt=0)),
+            late_fees=Sum('late_fee', default=0)
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Cuotas vencidas actualizadas: {accrued}"))
+        if cleared:
+            self.stdout.write(f"🧹 Cuotas puestas al día: {cleared}")
+        self.stdout.write(f"📈 Cuotas en mora: {totals['overdue']}, mora total ${totals['late_fees']:,.2f}")
@@ -0,0 +1,186 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from financing import engine, views
+from financing.golden_corpus import (
+    GOLDEN_PATH, build_corpus, check_corpus, load_corpus, write_corpus
+)
+from financing.models import CalculatorMode, FinancingPlan
+from financing.quote_cache import quote_cache
+from products.models import Product
+
+class Command(BaseCommand):
+    help = 'Mide latencia, rendimiento y consultas de las calculadoras y verifica el corpus de referencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Solicitudes por vista al medir latencia',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Cotizaciones por lote al medir rendimiento del motor',
+        )
+        parser.add_argument(
+            '--golden',
+            default=GOLDEN_PATH,
+            help='Ruta del corpus de referencia',
+        )
+        parser.add_argument(
+            '--update-golden',
+            action='store_true',
+            help='Regenerar el corpus con el motor actual en lugar de verificarlo',
+        )
+        parser.add_argument(
+            '--skip-views',
+            action='store_true',
+            help='No medir las vistas (solo motor y corpus)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Benchmark de calculadoras...')
+        )
+
+        if options['update_golden']:
+            corpus = build_corpus()
+            write_corpus(corpus, options['golden'])
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Corpus regenerado: {len(corpus['cases'])} casos en {options['golden']}")
+            )
+            return
+
+        self.check_golden(options['golden'])
+        self.benchmark_engine(options['golden'], options['batch_size'])
+        if not options['skip_views']:
+            self.benchmark_views(options['iterations'])
+
+    def check_golden(self, path):
+        try:
+            corpus = load_corpus(path)
+        except FileNotFoundError:
+            raise CommandError(f'No existe el corpus {path}; genérelo con --update-golden')
+
+        self.stdout.write(f"📋 Corpus de referencia: {len(corpus['cases'])} casos")
+        paths = [('decimal', False)]
+        if engine.np is not None:
+            paths.append(('numpy', True))
+
+        failed = False
+        for name, vectorize in paths:
+            mismatches = check_corpus(corpus, vectorize=vectorize)
+            if mismatches:
+                failed = True
+                self.stdout.write(self.style.ERROR(f"❌ Ruta {name}: {len(mismatches)} diferencias"))
+                for index, inputs, expected, actual in mismatches[:10]:
+                    self.stdout.write(f"   #{index} {inputs}: esperado {expected}, obtenido {actual}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ Ruta {name}: idéntica al corpus"))
+
+        if failed:
+            raise CommandError('El motor no reproduce el corpus de referencia')
+
+    def benchmark_engine(self, path, batch_size):
+        # El lote repite las entradas del corpus hasta completar el tamaño pedido
+        corpus_cases = [case[:5] for case in load_corpus(path)['cases']]
+        cases = (corpus_cases * (batch_size // len(corpus_cases) + 1))[:batch_size]
+        columns = [list(column) for column in zip(*cases)]
+
+        self.stdout.write('\n⏱️  Motor de amortización')
+
+        # Latencia por cotización individual
+        samples = []
+        for case in cases[:2000]:
+            started = time.perf_counter()
+            engine.calculate_quote(*case)
+            samples.append(time.perf_counter() - started)
+        self.write_latency('calculate_quote', samples)
+
+        # Rendimiento por lote
+        paths = [('decimal', False)]
+        if engine.np is not None:
+            paths.append(('numpy', True))
+        for name, vectorize in paths:
+            started = time.perf_counter()
+            engine.calculate_quotes(*columns, vectorize=vectorize)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"   calculate_quotes[{name}]: {len(cases)} cotizaciones en {elapsed:.3f}s "
+                f"({len(cases) / elapsed:,.0f}/s)"
+            )
+
+    def benchmark_views(self, iterations):
+        product = Product.objects.first()
+        plan = FinancingPlan.objects.filter(is_active=True).first()
+        modes = set(CalculatorMode.objects.filter(is_active=True).values_list('mode_type', flat=True))
+        if product is None:
+            self.stdout.write(self.style.WARNING('⚠️ No hay productos; se omiten las vistas'))
+            return
+
+        scenarios = []
+        if plan:
+            scenarios.append(('financing/calculate', views.FinancingCalculatorView, {
+                'product_id': product.id, 'financing_plan_id': plan.id,
+                'down_payment_percentage': max(plan.min_down_payment_percentage, 30),
+                'payment_frequency': 'monthly', 'term_months': min(plan.max_term_months, 12)
+            }))
+        scenarios.append(('simulator/calculate', views.SimulatorCalculateView, {
+            'product_id': product.id, 'down_payment_percentage': 30,
+            'term_months': 12, 'payment_frequency': 'monthly'
+        }))
+        if 'credito' in modes:
+            mode = CalculatorMode.objects.get(mode_type='credito')
+            down_payments = mode.get_down_payment_options() or [30]
+            terms = mode.get_term_options() or [12]
+            scenarios.append(('calculator/calculate credito', views.CalculatorCalculateView, {
+                'mode_type': 'credito', 'product_id': product.id,
+                'down_payment_percentage': down_payments[0], 'term_months': terms[0],
+                'payment_frequency': 'monthly'
+            }))
+        if 'programada' in modes:
+            mode = CalculatorMode.objects.get(mode_type='programada')
+            scenarios.append(('calculator/calculate programada', views.CalculatorCalculateView, {
+                'mode_type': 'programada', 'product_id': product.id,
+                'initial_contribution_percentage': mode.min_initial_contribution,
+                'monthly_payment': 300, 'punctuality': 'always'
+            }))
+
+        factory = APIRequestFactory()
+        self.stdout.write('\n⏱️  Vistas (sin caché / con caché)')
+        for name, view_class, data in scenarios:
+            view = view_class.as_view()
+            for cached in (False, True):
+                samples = []
+                queries = 0
+                for _ in range(iterations):
+                    if not cached:
+                        quote_cache.clear()
+                    request = factory.post('/', data, format='json')
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = view(request)
+                        samples.append(time.perf_counter() - started)
+                    queries = len(captured)
+                if response.status_code != 200:
+                    self.stdout.write(self.style.WARNING(f"⚠️ {name}: respuesta {response.status_code} {response.data}"))
+                    break
+                label = f"{name} [{'caché' if cached else 'frío'}]"
+                self.write_latency(label, samples, queries)
+
+    def write_latency(self, label, samples, queries=None):
+        samples = sorted(samples)
+        p50 = statistics.median(samples) * 1000
+        p95 = samples[int(len(samples) * 0.95) - 1] * 1000 if samples else 0
+        line = f"   {label}: p50 {p50:.3f} ms, p95 {p95:.3f} ms"
+        if queries is not None:
+            line += f", {queries} consultas"
+        self.stdout.write(line)
@@ -0,0 +1,95 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from financing.late_fees import accrue_late_fees, late_fee_amount
+from financing.models import FinancingRequest, PaymentSchedule
+
+# Número de cuota a partir del cual se crean las cuotas sintéticas, para no
+# chocar con los cronogramas reales
+SYNTHETIC_OFFSET = 1000000
+
+class Command(BaseCommand):
+    help = 'Mide el cálculo de mora sobre cuotas sintéticas (todo se revierte al terminar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--installments',
+            type=int,
+            default=1000000,
+            help='Cuotas sintéticas a generar',
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=1000,
+            help='Cuotas a verificar contra PaymentSchedule.calculate_late_fee',
+        )
+
+    def handle(self, *args, **options):
+        applications = list(FinancingRequest.objects.values_list('id', flat=True)[:1000])
+        if not applications:
+            raise CommandError('Se necesita al menos una solicitud para asociar las cuotas sintéticas')
+
+        total = options['installments']
+        today = timezone.now().date()
+        self.stdout.write(
+            self.style.SUCCESS(f'🚀 Benchmark de mora con {total:,} cuotas sintéticas...')
+        )
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            rng = random.Random(0)
+            batch = []
+            for index in range(total):
+                batch.append(PaymentSchedule(
+                    application_id=applications[index % len(applications)],
+                    payment_number=SYNTHETIC_OFFSET + index,
+                    due_date=today - timedelta(days=rng.randint(-60, 720)),
+                    amount=Decimal(rng.randint(1000, 200000)) / 100,
+                    is_paid=rng.random() < 0.3
+                ))
+                if len(batch) == 10000:
+                    PaymentSchedule.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                PaymentSchedule.objects.bulk_create(batch)
+            self.stdout.write(f"📋 Cuotas insertadas en {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            accrued, cleared = accrue_late_fees(today)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"⏱️  accrue_late_fees: {accrued:,} vencidas y {cleared:,} al día en {elapsed:.2f}s "
+                    f"({(accrued + cleared) / elapsed:,.0f} cuotas/s)"
+                )
+            )
+
+            # Verificación contra el cálculo por cuota en Decimal
+            sample = PaymentSchedule.objects.filter(
+                payment_number__gte=SYNTHETIC_OFFSET
+            ).order_by('?')[:options['sample']]
+            mismatches = 0
+            for schedule in sample:
+                days_late, late_fee = schedule.days_late, schedule.late_fee
+                schedule.calculate_late_fee(today)
+                if (days_late, late_fee) != (schedule.days_late, schedule.late_fee):
+                    mismatches += 1
+                    if mismatches <= 10:
+                        self.stdout.write(
+                            f"   cuota {schedule.pk}: SQL ({days_late}, {late_fee}) "
+                            f"≠ Decimal ({schedule.days_late}, {schedule.late_fee})"
+                        )
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f"❌ {mismatches} diferencias en la muestra"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ Muestra de {len(sample)} cuotas idéntica al cálculo Decimal"))
+
+            transaction.set_rollback(True)
+        self.stdout.write('🧹 Cuotas sintéticas revertidas')
@@ -1,6 +1,19 @@
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.utils import timezone
+from django.db import connection, connections
+from django.db.models import Count, Q
 from financing.models import FinancingRequest, PaymentSchedule
+from financing.schedule_jobs import generate_chunk, init_worker
+from financing.virtual_schedule import virtual_schedules_enabled
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, 'generate_schedules.checkpoint.json')
+
 
 class Command(BaseCommand):
     help = 'Genera cronogramas de pago para solicitudes aprobadas que no los tengan'
@@ -9,104 +22,151 @@ class Command(BaseCommand):
         parser.add_argument(
             '--force',
             action='store_true',
-            help='Regenerar cronogramas existentes',
+            help='Recalcular cronogramas existentes (solo cambian las cuotas no pagadas)',
         )
         parser.add_argument(
             '--application-id',
             type=int,
             help='Generar cronograma solo para una solicitud específica',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Solicitudes por bloque',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help='Procesos en paralelo (1 = sin paralelismo)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=DEFAULT_CHECKPOINT,
+            help='Archivo de progreso para reanudar una ejecución interrumpida',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignorar el progreso guardado y empezar desde el principio',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
             self.style.SUCCESS('🚀 Iniciando generación de cronogramas de pago...')
         )
 
-        # Filtrar solicitudes aprobadas
+        if virtual_schedules_enabled():
+            self.stdout.write(
+                self.style.WARNING('⚠️ Cronogramas virtuales activos: las cuotas se calculan al leerlas y no se guardan')
+            )
+
+        # Filtrar solicitudes aprobadas; el conteo de cuotas se anota en la
+        # misma consulta en lugar de contarlas solicitud por solicitud
         queryset = FinancingRequest.objects.filter(status='approved')
-        
+
         if options['application_id']:
             queryset = queryset.filter(id=options['application_id'])
-            
-        total_requests = queryset.count()
+
+        counts = queryset.annotate(schedule_count=Count('payment_schedule')).aggregate(
+            total=Count('id'),
+            with_schedule=Count('id', filter=Q(schedule_count__gt=0))
+        )
+        total_requests = counts['total']
         self.stdout.write(f"📋 Encontradas {total_requests} solicitudes aprobadas")
-        
-        processed = 0
-        skipped = 0
-        errors = 0
-        
-        for request in queryset:
-            try:
-                # Verificar si ya tiene cronograma
-                existing_schedule = request.payment_schedule.count()
-                
-                if existing_schedule > 0 and not options['force']:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"⏭️  Solicitud {request.application_number} ya tiene cronograma ({existing_schedule} cuotas)"
-                        )
-                    )
-                    skipped += 1
-                    continue
-                
-                # Generar cronograma
-                self.stdout.write(f"🔄 Procesando solicitud {request.application_number}...")
-                
-                # Si force=True, eliminar cronograma existente
-                if options['force'] and existing_schedule > 0:
-                    request.payment_schedule.all().delete()
-                    self.stdout.write(
-                        self.style.WARNING(f"🗑️  Eliminado cronograma existente")
-                    )
-                
-                request.calculate_payment_schedule()
-                new_schedule_count = request.payment_schedule.count()
-                
-                if new_schedule_count > 0:
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"✅ Generado cronograma para {request.application_number}: "
-                            f"{new_schedule_count} cuotas de ${request.payment_amount}"
-                        )
-                    )
-                    processed += 1
-                else:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f"❌ Error: No se generaron cuotas para {request.application_number}"
-                        )
-                    )
-                    errors += 1
-                    
-            except Exception as e:
+
+        if not options['force']:
+            queryset = queryset.annotate(schedule_count=Count('payment_schedule')).filter(schedule_count=0)
+            skipped = counts['with_schedule']
+        else:
+            skipped = 0
+
+        # Progreso guardado de una ejecución anterior con las mismas opciones
+        run_key = {'force': options['force'], 'application_id': options['application_id']}
+        checkpoint = self.load_checkpoint(options['checkpoint'], run_key, options['restart'])
+        last_id = checkpoint.get('last_id', 0)
+        processed = checkpoint.get('processed', 0)
+        errors = checkpoint.get('errors', 0)
+        if last_id:
+            # Las generadas en la ejecución anterior ya cuentan como procesadas
+            skipped = max(0, skipped - processed)
+            self.stdout.write(
+                self.style.WARNING(f"⏩ Reanudando después de la solicitud #{last_id} ({processed} ya procesadas)")
+            )
+
+        def record(chunk, result):
+            nonlocal processed, skipped, errors
+            written, unchanged, chunk_errors = result
+            processed += written
+            skipped += unchanged
+            errors += len(chunk_errors)
+            for application_number, message in chunk_errors:
                 self.stdout.write(
-                    self.style.ERROR(
-                        f"💥 Error procesando solicitud {request.application_number}: {str(e)}"
-                    )
+                    self.style.ERROR(f"💥 Error procesando solicitud {application_number}: {message}")
                 )
-                errors += 1
-        
+            self.save_checkpoint(options['checkpoint'], dict(
+                run_key, last_id=chunk[-1], processed=processed, errors=errors
+            ))
+            self.stdout.write(
+                f"🔄 Bloque hasta #{chunk[-1]}: {written} generados, {unchanged} al día, {len(chunk_errors)} errores"
+            )
+
+        chunks = self.iter_chunks(queryset, last_id, options['chunk_size'])
+        workers = max(1, options['workers'])
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite admite un solo escritor a la vez
+            self.stdout.write(self.style.WARNING('⚠️ SQLite no admite escrituras en paralelo; se usa un solo proceso'))
+            workers = 1
+        if workers == 1:
+            for chunk in chunks:
+                record(chunk, generate_chunk(chunk))
+        else:
+            # Los hijos no deben heredar conexiones abiertas del proceso principal
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker
+            ) as executor:
+                # Los resultados se registran en orden para que el progreso
+                # guardado nunca salte un bloque sin terminar
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(generate_chunk, chunk)))
+                    while len(pending) >= workers * 2:
+                        chunk_done, future = pending.popleft()
+                        record(chunk_done, future.result())
+                while pending:
+                    chunk_done, future = pending.popleft()
+                    record(chunk_done, future.result())
+
+        if os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+
         # Resumen final
         self.stdout.write("\n" + "="*50)
         self.stdout.write(self.style.SUCCESS(f"📊 RESUMEN DE PROCESAMIENTO:"))
         self.stdout.write(f"   📝 Total de solicitudes: {total_requests}")
         self.stdout.write(self.style.SUCCESS(f"   ✅ Procesadas exitosamente: {processed}"))
         if skipped > 0:
-            self.stdout.write(self.style.WARNING(f"   ⏭️  Saltadas (ya tenían cronograma): {skipped}"))
+            self.stdout.write(self.style.WARNING(f"   ⏭️  Saltadas (ya tenían cronograma al día): {skipped}"))
         if errors > 0:
             self.stdout.write(self.style.ERROR(f"   ❌ Errores: {errors}"))
-        
+
         # Mostrar estadísticas del sistema
+        totals = FinancingRequest.objects.aggregate(
+            total=Count('id'),
+            approved=Count('id', filter=Q(status='approved'))
+        )
         total_schedules = PaymentSchedule.objects.count()
-        total_applications = FinancingRequest.objects.count()
-        approved_applications = FinancingRequest.objects.filter(status='approved').count()
-        
+
         self.stdout.write("\n" + "="*50)
         self.stdout.write(self.style.SUCCESS(f"📈 ESTADÍSTICAS DEL SISTEMA:"))
-        self.stdout.write(f"   🔢 Total de solicitudes: {total_applications}")
-        self.stdout.write(f"   ✅ Solicitudes aprobadas: {approved_applications}")
+        self.stdout.write(f"   🔢 Total de solicitudes: {totals['total']}")
+        self.stdout.write(f"   ✅ Solicitudes aprobadas: {totals['approved']}")
         self.stdout.write(f"   📅 Total cuotas programadas: {total_schedules}")
-        
+
         if processed > 0:
             self.stdout.write(
                 self.style.SUCCESS(
@@ -118,4 +178,33 @@ class Command(BaseCommand):
                 self.style.WARNING(
                     f"\n⚠️  No se generaron nuevos cronogramas."
                 )
-            ) 
\ No newline at end of file
+            )
+
+    def iter_chunks(self, queryset, last_id, chunk_size):
+        """IDs en bloques ordenados, paginando por clave para no cargar toda la lista"""
+        while True:
+            chunk = list(
+                queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
+    def load_checkpoint(self, path, run_key, restart):
+        if restart or not os.path.exists(path):
+            return {}
+        with open(path) as handle:
+            checkpoint = json.load(handle)
+        if any(checkpoint.get(key) != value for key, value in run_key.items()):
+            self.stdout.write(
+                self.style.WARNING('⚠️ El progreso guardado corresponde a otras opciones; se ignora')
+            )
+            return {}
+        return checkpoint
+
+    def save_checkpoint(self, path, checkpoint):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(checkpoint, handle)
+        os.replace(temporary, path)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from core.snapshots import SNAPSHOT_PATHS, publish_snapshots, snapshot_root
+
+class Command(BaseCommand):
+    help = 'Publica los snapshots JSON (planos y gzip) de los endpoints públicos de lectura'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            choices=SNAPSHOT_PATHS,
+            help='Publicar solo el endpoint indicado (se puede repetir)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS(f'🚀 Publicando snapshots en {snapshot_root()}...')
+        )
+
+        results = publish_snapshots(options['path'])
+
+        published = 0
+        for path, size in results.items():
+            if size is None:
+                self.stdout.write(self.style.WARNING(f"⚠️ {path}: no publicado"))
+            else:
+                published += 1
+                self.stdout.write(f"📋 {path}: {size:,} bytes")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {published} de {len(results)} snapshots publicados")
+        )
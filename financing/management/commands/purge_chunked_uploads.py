@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from financing.chunked_uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Elimina subidas por fragmentos abandonadas y sus archivos temporales'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            help='Antigüedad mínima sin actividad (por defecto CHUNKED_UPLOAD_EXPIRE_HOURS)',
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options['hours']) if options['hours'] is not None else None
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Purgando subidas por fragmentos abandonadas...')
+        )
+        purged = purge_expired(older_than)
+        self.stdout.write(self.style.SUCCESS(f"🧹 Subidas eliminadas: {purged}"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from financing.models import ProductQuote
+from financing.quote_tables import rebuild_product_quotes
+
+class Command(BaseCommand):
+    help = 'Reconstruye las tablas de cotizaciones precalculadas por producto'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product-id',
+            type=int,
+            action='append',
+            help='Reconstruir solo el producto indicado (se puede repetir)',
+        )
+
+    def handle(self, *args, **options):
+        product_ids = options['product_id']
+
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Reconstruyendo tablas de cotizaciones...')
+        )
+
+        total_rows = rebuild_product_quotes(product_ids=product_ids)
+
+        if product_ids:
+            self.stdout.write(f"📋 Productos procesados: {', '.join(str(pk) for pk in product_ids)}")
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {total_rows} cotizaciones generadas")
+        )
+        self.stdout.write(f"📈 Total en la tabla: {ProductQuote.objects.count()}")
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from financing.liquidity import DEFAULT_MONTHS, load_pool, simulate_pool
+
+class Command(BaseCommand):
+    help = 'Proyecta la liquidez del fondo de Compra Programada y las adjudicaciones que puede financiar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=DEFAULT_MONTHS,
+            help=f'Meses a proyectar (por defecto {DEFAULT_MONTHS})',
+        )
+        parser.add_argument(
+            '--collection-rate',
+            type=float,
+            default=1.0,
+            help='Fracción de las cuotas que se espera cobrar (0 a 1)',
+        )
+        parser.add_argument(
+            '--initial-balance',
+            type=float,
+            help='Saldo inicial del fondo (por defecto, aportes de contratos no adjudicados)',
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError('--months debe ser un número positivo de meses')
+
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Simulando liquidez del fondo de Compra Programada...')
+        )
+
+        started = time.perf_counter()
+        pool = load_pool(months=options['months'])
+        loaded = time.perf_counter()
+        results = simulate_pool(
+            pool,
+            collection_rate=options['collection_rate'],
+            initial_balance=options['initial_balance'],
+        )
+        finished = time.perf_counter()
+
+        self.stdout.write(
+            f"📋 {len(pool)} contratos cargados en {loaded - started:.2f}s, "
+            f"simulados en {finished - loaded:.3f}s"
+        )
+        self.stdout.write(
+            f"{'Mes':<8} {'Ingresos':>14} {'Adjud.':>7} {'Pagado':>14} {'Saldo':>14} {'En espera':>10} {'Pendientes':>11}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['month']:%Y-%m} {row['inflow']:>14,.2f} {row['adjudications']:>7} "
+                f"{row['payout']:>14,.2f} {row['balance']:>14,.2f} "
+                f"{row['eligible_waiting']:>10} {row['pending_contracts']:>11}"
+            )
+
+        total_adjudications = sum(row['adjudications'] for row in results)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {total_adjudications} adjudicaciones financiables en {len(results)} meses")
+        )
+        if results and results[-1]['eligible_waiting']:
+            self.stdout.write(
+                self.style.WARNING(f"⚠️ {results[-1]['eligible_waiting']} contratos elegibles quedan sin fondos al final")
+            )
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+        ('financing', '0020_add_user_agent_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductQuote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('down_payment_percentage', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Porcentaje de inicial')),
+                ('term_months', models.IntegerField(verbose_name='Plazo en meses')),
+                ('payment_frequency', models.CharField(choices=[('weekly', 'Semanal'), ('biweekly', 'Quincenal'), ('monthly', 'Mensual')], max_length=20, verbose_name='Frecuencia de pago')),
+                ('number_of_payments', models.IntegerField(verbose_name='Número de cuotas')),
+                ('down_payment_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Monto de inicial')),
+                ('financed_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Monto a financiar')),
+                ('payment_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Monto de cada cuota')),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Monto total a pagar')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('calculator_mode', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_quotes', to='financing.calculatormode', verbose_name='Modalidad')),
+                ('financing_plan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_quotes', to='financing.financingplan', verbose_name='Plan de financiamiento')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quotes', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Cotización Precalculada',
+                'verbose_name_plural': 'Cotizaciones Precalculadas',
+                'ordering': ['product', 'payment_frequency', 'payment_amount'],
+                'indexes': [models.Index(fields=['product', 'payment_frequency', 'payment_amount'], name='productquote_lookup_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financing', '0022_configversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentschedule',
+            index=models.Index(fields=['is_paid', 'due_date'], name='financing_schedule_due_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financing', '0023_paymentschedule_due_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DelinquencyBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('1-30', '1 a 30 días'), ('31-60', '31 a 60 días'), ('61-90', '61 a 90 días'), ('90+', 'Más de 90 días')], max_length=10, verbose_name='Tramo')),
+                ('installments', models.IntegerField(default=0, verbose_name='Cuotas vencidas')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Monto vencido')),
+                ('late_fees', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Mora')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delinquency_buckets', to='financing.financingrequest', verbose_name='Solicitud')),
+            ],
+            options={
+                'verbose_name': 'Tramo de Morosidad',
+                'verbose_name_plural': 'Tramos de Morosidad',
+                'unique_together': {('application', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financing', '0024_delinquencybucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(unique=True, verbose_name='Año')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Último número')),
+            ],
+            options={
+                'verbose_name': 'Contador de Solicitudes',
+                'verbose_name_plural': 'Contadores de Solicitudes',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('financing', '0026_payment_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('receipt_file', 'Comprobante de pago'), ('income_proof', 'Comprobante de ingresos'), ('id_document', 'Documento de identidad'), ('address_proof', 'Comprobante de domicilio')], max_length=20, verbose_name='Destino')),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre del archivo')),
+                ('size', models.BigIntegerField(verbose_name='Tamaño (bytes)')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='Bytes recibidos')),
+                ('expected_sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 esperado')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('status', models.CharField(choices=[('uploading', 'Subiendo'), ('complete', 'Completa'), ('attached', 'Adjuntada')], default='uploading', max_length=20, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('application', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='financing.financingrequest', verbose_name='Solicitud')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='financing.payment', verbose_name='Pago')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Subida por Fragmentos',
+                'verbose_name_plural': 'Subidas por Fragmentos',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models.functions import Coalesce
+
+
+def backfill_approved_at(apps, schema_editor):
+    """
+    Solicitudes aprobadas desde el formulario del admin quedaron sin
+    approved_at; se toma la fecha de revisión o, en su defecto, la última
+    actualización para anclar su cronograma.
+    """
+    FinancingRequest = apps.get_model('financing', 'FinancingRequest')
+    FinancingRequest.objects.filter(
+        status__in=['approved', 'active', 'completed'], approved_at__isnull=True
+    ).update(approved_at=Coalesce('review_date', 'updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financing', '0027_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_approved_at, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,16 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from products.models import Product
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
+from decimal import Decimal
 from django.core.exceptions import ValidationError
 import os
+from core.tracking import LoadedValuesMixin
+from .application_numbers import next_application_number
+from .engine import split_installments
+from .virtual_schedule import SCHEDULED_STATUSES
 
 # Create your models here.
 
@@ -44,8 +49,10 @@ class FinancingPlan(models.Model):
         return self.name
 
 
-class FinancingRequest(models.Model):
+class FinancingRequest(LoadedValuesMixin, models.Model):
     """Solicitud de financiamiento"""
+    tracked_fields = ('status',)
+    
     STATUSES = [
         ('draft', 'Borrador'),
         ('submitted', 'Enviada'),
@@ -216,54 +223,139 @@ class FinancingRequest(models.Model):
         if not self.application_number:
             # Generar número único de solicitud
             self.application_number = self.generate_application_number()
+        if self.status in SCHEDULED_STATUSES and self.approved_at is None:
+            # El cronograma (guardado o virtual) se ancla en la fecha de
+            # aprobación, también al aprobar desde el formulario del admin
+            self.approved_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'approved_at'}
         super().save(*args, **kwargs)
     
     def generate_application_number(self):
-        """Genera un número único de solicitud"""
-        prefix = "APP"
-        year = timezone.now().year
-        # Obtener el último número de este año
-        last_app = FinancingRequest.objects.filter(
-            application_number__startswith=f"{prefix}{year}"
-        ).order_by('-application_number').first()
-        
-        if last_app:
-            last_number = int(last_app.application_number[-5:])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-        
-        return f"{prefix}{year}{new_number:05d}"
+        """Genera un número único de solicitud (ver financing/application_numbers.py)"""
+        return next_application_number()
     
-    def calculate_payment_schedule(self):
-        """Calcula y genera el calendario de pagos"""
+    def schedule_due_dates(self, start_date=None):
+        """Fechas de vencimiento de todas las cuotas, calculadas en una pasada"""
         from datetime import timedelta
         from dateutil.relativedelta import relativedelta
         
-        if self.status != 'approved':
-            return
-        
-        # Limpiar calendario existente
-        self.payment_schedule.all().delete()
+        # Fecha de inicio (primer pago): siempre una fecha guardada, para que
+        # las cuotas virtuales no se muevan de un día a otro
+        if start_date is None:
+            anchor = self.approved_at or self.review_date or self.created_at
+            start_date = anchor.date() if anchor else timezone.now().date()
         
-        # Fecha de inicio (primer pago)
-        start_date = self.approved_at.date() if self.approved_at else timezone.now().date()
-        
-        # Calcular fechas según frecuencia
-        for i in range(1, self.number_of_payments + 1):
-            if self.payment_frequency == 'weekly':
-                due_date = start_date + timedelta(weeks=i)
-            elif self.payment_frequency == 'biweekly':
-                due_date = start_date + timedelta(weeks=i*2)
-            else:  # monthly
-                due_date = start_date + relativedelta(months=i)
-            
-            PaymentSchedule.objects.create(
+        if self.payment_frequency == 'weekly':
+            step = timedelta(weeks=1)
+        elif self.payment_frequency == 'biweekly':
+            step = timedelta(weeks=2)
+        else:  # monthly: se suma desde la fecha de inicio para respetar fin de mes
+            return [start_date + relativedelta(months=i) for i in range(1, self.number_of_payments + 1)]
+        return [start_date + step * i for i in range(1, self.number_of_payments + 1)]
+    
+    def build_payment_schedule(self):
+        """Cuotas del calendario de pagos en memoria (sin guardar)"""
+        # Montos al centavo: la última cuota absorbe el redondeo para que el
+        # cronograma sume exactamente el total financiado
+        amounts = split_installments(
+            self.total_amount - self.down_payment_amount,
+            self.number_of_payments,
+            self.payment_amount
+        )
+        return [
+            PaymentSchedule(
                 application=self,
-                payment_number=i,
+                payment_number=number,
                 due_date=due_date,
-                amount=self.payment_amount
+                amount=amount
             )
+            for number, (due_date, amount) in enumerate(zip(self.schedule_due_dates(), amounts), start=1)
+        ]
+    
+    def get_payment_schedule(self):
+        """Calendario completo para mostrar, con cuotas virtuales si están activas"""
+        from .virtual_schedule import SCHEDULED_STATUSES, merge_schedule, virtual_schedules_enabled
+        
+        stored = self.payment_schedule.all()
+        if not virtual_schedules_enabled() or self.status not in SCHEDULED_STATUSES:
+            return list(stored)
+        return merge_schedule(self, stored)
+    
+    def materialize_installment(self, payment_number):
+        """Retorna la cuota guardada con ese número, creándola desde el cálculo si no existe"""
+        existing = self.payment_schedule.filter(payment_number=payment_number).first()
+        if existing is not None:
+            return existing
+        
+        for item in self.build_payment_schedule():
+            if item.payment_number == payment_number:
+                schedule, _ = PaymentSchedule.objects.get_or_create(
+                    application=self,
+                    payment_number=payment_number,
+                    defaults={'due_date': item.due_date, 'amount': item.amount}
+                )
+                return schedule
+        raise PaymentSchedule.DoesNotExist(f"La solicitud no tiene la cuota {payment_number}")
+    
+    def calculate_payment_schedule(self, materialize=False):
+        """
+        Calcula y genera el calendario de pagos.
+        
+        El calendario guardado se compara con el calculado y sólo se emiten
+        los cambios necesarios sobre las cuotas no pagadas: se actualizan en
+        su lugar las que cambiaron (conservando su id y los pagos asociados),
+        se insertan las que faltan y se eliminan las que sobran. Las cuotas
+        pagadas no se tocan. Todo ocurre en una transacción con la solicitud
+        bloqueada, así que la señal, las acciones del admin y
+        generate_schedules pueden llamarlo repetidamente sin trabajo
+        duplicado. Retorna True si hubo cambios.
+        
+        Con cronogramas virtuales (VIRTUAL_PAYMENT_SCHEDULES) no se escribe
+        nada salvo que se pida materialize=True.
+        """
+        from .aging import rebuild_application_aging
+        from .virtual_schedule import virtual_schedules_enabled
+        
+        if self.status != 'approved':
+            return False
+        if virtual_schedules_enabled() and not materialize:
+            return False
+        
+        target = {item.payment_number: item for item in self.build_payment_schedule()}
+        
+        with transaction.atomic():
+            FinancingRequest.objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True).first()
+            
+            to_update = []
+            to_delete = []
+            for existing in self.payment_schedule.all():
+                item = target.pop(existing.payment_number, None)
+                if existing.is_paid:
+                    continue
+                if item is None:
+                    to_delete.append(existing.pk)
+                elif existing.due_date != item.due_date or existing.amount != item.amount:
+                    existing.due_date = item.due_date
+                    existing.amount = item.amount
+                    # El atraso y la mora se recalculan con el nuevo vencimiento
+                    # en el próximo accrue_late_fees
+                    existing.days_late = 0
+                    existing.late_fee = 0
+                    to_update.append(existing)
+            to_create = list(target.values())
+            
+            if to_delete:
+                PaymentSchedule.objects.filter(pk__in=to_delete).delete()
+            if to_update:
+                PaymentSchedule.objects.bulk_update(to_update, ['due_date', 'amount', 'days_late', 'late_fee'])
+            if to_create:
+                PaymentSchedule.objects.bulk_create(to_create)
+            if to_update or to_create:
+                # bulk_update/bulk_create no emiten las señales que mantienen
+                # el resumen de morosidad
+                rebuild_application_aging(self.pk)
+        return bool(to_delete or to_update or to_create)
 
 
 class PaymentMethod(models.Model):
@@ -359,8 +451,10 @@ class CompanyBankAccount(models.Model):
         super().save(*args, **kwargs)
 
 
-class Payment(models.Model):
+class Payment(LoadedValuesMixin, models.Model):
     """Pagos realizados - MODELO EXPANDIDO PARA COMPROBANTES"""
+    tracked_fields = ('status', 'amount', 'payment_schedule')
+    
     TYPES = [
         ('initial', 'Pago Inicial'),
         ('installment', 'Cuota Mensual'),
@@ -501,6 +595,10 @@ class Payment(models.Model):
         verbose_name = "Pago"
         verbose_name_plural = "Pagos"
         ordering = ['-payment_date']
+        indexes = [
+            # Paginación por cursor del historial de pagos (UserPaymentsView)
+            models.Index(fields=['payment_date', 'id'], name='financing_payment_keyset_idx'),
+        ]
         permissions = [
             ("can_verify_payment", "Puede verificar pagos"),
             ("can_reject_payment", "Puede rechazar pagos"),
@@ -542,11 +640,8 @@ class Payment(models.Model):
         self.verified_at = timezone.now()
         if admin_notes:
             self.admin_notes = admin_notes
+        # La cuota programada se actualiza en apply_verified_payment (post_save)
         self.save()
-        
-        # Actualizar el cronograma de pagos si aplica
-        if self.payment_schedule:
-            self.payment_schedule.mark_as_paid(self.amount, self.payment_date.date())
     
     def mark_as_rejected(self, rejected_by_user, rejection_reason):
         """Marca el pago como rechazado"""
@@ -621,8 +716,10 @@ class PaymentAttachment(models.Model):
         super().save(*args, **kwargs)
 
 
-class PaymentSchedule(models.Model):
+class PaymentSchedule(LoadedValuesMixin, models.Model):
     """Calendario de pagos"""
+    tracked_fields = ('due_date', 'amount', 'is_paid', 'paid_amount', 'days_late', 'late_fee')
+    
     application = models.ForeignKey(
         FinancingRequest, 
         on_delete=models.CASCADE, 
@@ -662,19 +759,25 @@ class PaymentSchedule(models.Model):
         verbose_name_plural = "Cuotas Programadas"
         ordering = ['application', 'payment_number']
         unique_together = ['application', 'payment_number']
+        indexes = [
+            # Cuotas pendientes por vencimiento (mora nocturna, antigüedad de saldos)
+            models.Index(fields=['is_paid', 'due_date'], name='financing_schedule_due_idx'),
+        ]
     
     def __str__(self):
         return f"Cuota {self.payment_number} - {self.due_date}"
     
-    def calculate_late_fee(self):
-        """Calcula los días de atraso y el cargo por mora"""
-        if self.is_paid or self.due_date >= timezone.now().date():
+    def calculate_late_fee(self, as_of=None):
+        """Calcula los días de atraso y el cargo por mora (regla en financing/late_fees.py)"""
+        from .late_fees import late_fee_amount
+        
+        today = as_of or timezone.now().date()
+        if self.is_paid or self.due_date >= today:
             self.days_late = 0
-            self.late_fee = 0
+            self.late_fee = Decimal('0.00')
         else:
-            self.days_late = (timezone.now().date() - self.due_date).days
-            # Calcular mora (ejemplo: 1% del monto por cada 7 días de atraso)
-            self.late_fee = (self.amount * 0.01) * (self.days_late // 7)
+            self.days_late = (today - self.due_date).days
+            self.late_fee = late_fee_amount(self.amount, self.days_late)
         return self.late_fee
     
     def mark_as_paid(self, paid_amount, paid_date):
@@ -955,27 +1058,252 @@ class CalculatorMode(models.Model):
             return [int(x.strip()) for x in self.available_terms.split(',')]
         return []
 
+
+class ProductQuote(models.Model):
+    """Cotizaciones precalculadas por producto (ver financing/quote_tables.py)"""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='quotes',
+        verbose_name="Producto"
+    )
+    calculator_mode = models.ForeignKey(
+        CalculatorMode,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='product_quotes',
+        verbose_name="Modalidad"
+    )
+    financing_plan = models.ForeignKey(
+        FinancingPlan,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='product_quotes',
+        verbose_name="Plan de financiamiento"
+    )
+    down_payment_percentage = models.DecimalField(max_digits=5, decimal_places=2, verbose_name="Porcentaje de inicial")
+    term_months = models.IntegerField(verbose_name="Plazo en meses")
+    payment_frequency = models.CharField(
+        max_length=20,
+        choices=FinancingRequest.PAYMENT_FREQUENCIES,
+        verbose_name="Frecuencia de pago"
+    )
+    number_of_payments = models.IntegerField(verbose_name="Número de cuotas")
+    down_payment_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Monto de inicial")
+    financed_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Monto a financiar")
+    payment_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Monto de cada cuota")
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Monto total a pagar")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Cotización Precalculada"
+        verbose_name_plural = "Cotizaciones Precalculadas"
+        ordering = ['product', 'payment_frequency', 'payment_amount']
+        indexes = [
+            models.Index(fields=['product', 'payment_frequency', 'payment_amount'], name='productquote_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product} - {self.term_months} meses {self.get_payment_frequency_display()}: ${self.payment_amount}"
+
+class ConfigVersion(models.Model):
+    """
+    Versión compartida de la configuración (una fila).
+    
+    Las señales de los modelos de configuración la incrementan y cada worker
+    la compara con la versión de sus cachés en memoria para descartarlas
+    (ver financing/config_version.py).
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Versión")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Versión de Configuración"
+        verbose_name_plural = "Versión de Configuración"
+    
+    def __str__(self):
+        return f"Versión {self.version}"
+
+class DelinquencyBucket(models.Model):
+    """
+    Resumen de cuotas vencidas por solicitud y tramo de atraso.
+    
+    Lo reconstruye accrue_late_fees cada noche y lo ajustan las señales de
+    PaymentSchedule cuando una cuota se paga o cambia (ver financing/aging.py).
+    """
+    BUCKETS = [
+        ('1-30', '1 a 30 días'),
+        ('31-60', '31 a 60 días'),
+        ('61-90', '61 a 90 días'),
+        ('90+', 'Más de 90 días'),
+    ]
+    
+    application = models.ForeignKey(
+        FinancingRequest,
+        on_delete=models.CASCADE,
+        related_name='delinquency_buckets',
+        verbose_name="Solicitud"
+    )
+    bucket = models.CharField(max_length=10, choices=BUCKETS, verbose_name="Tramo")
+    installments = models.IntegerField(default=0, verbose_name="Cuotas vencidas")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Monto vencido")
+    late_fees = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Mora")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Tramo de Morosidad"
+        verbose_name_plural = "Tramos de Morosidad"
+        unique_together = ['application', 'bucket']
+    
+    def __str__(self):
+        return f"{self.application_id} {self.bucket}: {self.installments} cuotas"
+
+class ApplicationNumberCounter(models.Model):
+    """Último número de solicitud emitido por año (ver financing/application_numbers.py)"""
+    year = models.PositiveIntegerField(unique=True, verbose_name="Año")
+    last_number = models.PositiveIntegerField(default=0, verbose_name="Último número")
+    
+    class Meta:
+        verbose_name = "Contador de Solicitudes"
+        verbose_name_plural = "Contadores de Solicitudes"
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
+class ChunkedUpload(models.Model):
+    """
+    Subida de archivo por fragmentos que se puede reanudar.
+    
+    Los fragmentos se escriben en un archivo temporal bajo MEDIA_ROOT; al
+    completarse, el archivo se adjunta al comprobante del pago o al documento
+    de la solicitud (ver financing/chunked_uploads.py).
+    """
+    TARGETS = [
+        ('receipt_file', 'Comprobante de pago'),
+        ('income_proof', 'Comprobante de ingresos'),
+        ('id_document', 'Documento de identidad'),
+        ('address_proof', 'Comprobante de domicilio'),
+    ]
+    STATUSES = [
+        ('uploading', 'Subiendo'),
+        ('complete', 'Completa'),
+        ('attached', 'Adjuntada'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads',
+        verbose_name="Usuario"
+    )
+    target = models.CharField(max_length=20, choices=TARGETS, verbose_name="Destino")
+    application = models.ForeignKey(
+        FinancingRequest,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Solicitud"
+    )
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name="Pago"
+    )
+    filename = models.CharField(max_length=255, verbose_name="Nombre del archivo")
+    size = models.BigIntegerField(verbose_name="Tamaño (bytes)")
+    offset = models.BigIntegerField(default=0, verbose_name="Bytes recibidos")
+    expected_sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256 esperado")
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256")
+    status = models.CharField(max_length=20, choices=STATUSES, default='uploading', verbose_name="Estado")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+    
+    class Meta:
+        verbose_name = "Subida por Fragmentos"
+        verbose_name_plural = "Subidas por Fragmentos"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
 # SIGNALS PARA GENERACIÓN AUTOMÁTICA DE CRONOGRAMAS
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_save, post_delete
 from django.dispatch import receiver
+from products.models import Category
+from .quote_cache import quote_cache
+from core.snapshots import schedule_publish
 
-@receiver(pre_save, sender=FinancingRequest)
-def track_status_change(sender, instance, **kwargs):
-    """Detecta cambios de estado en solicitudes de financiamiento"""
-    if instance.pk:
-        try:
-            old_instance = FinancingRequest.objects.get(pk=instance.pk)
-            instance._old_status = old_instance.status
-        except FinancingRequest.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=CalculatorMode)
+@receiver([post_save, post_delete], sender=FinancingPlan)
+@receiver([post_save, post_delete], sender=FinancingConfiguration)
+@receiver([post_save, post_delete], sender=DownPaymentOption)
+@receiver([post_save, post_delete], sender=FinancingTerm)
+@receiver([post_save, post_delete], sender=PaymentFrequency)
+@receiver([post_save, post_delete], sender=HelpText)
+@receiver([post_save, post_delete], sender=PaymentMethod)
+@receiver([post_save, post_delete], sender=CompanyBankAccount)
+def invalidate_quote_cache(sender, **kwargs):
+    """Invalida las cotizaciones y payloads guardados cuando cambia la configuración"""
+    quote_cache.bump_version()
+
+@receiver(m2m_changed, sender=CompanyBankAccount.payment_methods.through)
+def invalidate_payment_methods(sender, action, **kwargs):
+    """Las cuentas asociadas a un método cambian sin pasar por post_save"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        quote_cache.bump_version()
+
+@receiver(post_save, sender=Product)
+def refresh_product_quotes(sender, instance, raw=False, **kwargs):
+    """Recalcula la tabla de cotizaciones del producto modificado"""
+    if raw:
+        return
+    from .quote_tables import rebuild_product_quotes
+    transaction.on_commit(lambda: rebuild_product_quotes(product_ids=[instance.pk]))
+
+@receiver([post_save, post_delete], sender=CalculatorMode)
+@receiver([post_save, post_delete], sender=FinancingPlan)
+@receiver([post_save, post_delete], sender=FinancingConfiguration)
+@receiver([post_save, post_delete], sender=DownPaymentOption)
+@receiver([post_save, post_delete], sender=FinancingTerm)
+def refresh_all_product_quotes(sender, raw=False, **kwargs):
+    """Recalcula todas las tablas de cotizaciones cuando cambia una modalidad, un plan o su configuración"""
+    if raw:
+        return
+    from .quote_tables import rebuild_product_quotes
+    transaction.on_commit(rebuild_product_quotes)
+
+# Se registra después de las tablas de cotizaciones para que el snapshot del
+# catálogo se publique con las cuotas ya recalculadas
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=CalculatorMode)
+@receiver([post_save, post_delete], sender=FinancingPlan)
+@receiver([post_save, post_delete], sender=FinancingConfiguration)
+@receiver([post_save, post_delete], sender=DownPaymentOption)
+@receiver([post_save, post_delete], sender=FinancingTerm)
+@receiver([post_save, post_delete], sender=PaymentFrequency)
+@receiver([post_save, post_delete], sender=HelpText)
+def publish_api_snapshots(sender, raw=False, **kwargs):
+    """Republica los snapshots JSON públicos al confirmar el cambio"""
+    if raw:
+        return
+    schedule_publish()
 
 @receiver(post_save, sender=FinancingRequest)
 def auto_generate_payment_schedule(sender, instance, created, **kwargs):
     """Genera automáticamente el cronograma de pagos cuando se aprueba una solicitud"""
     if not created:  # Solo para actualizaciones, no para nuevas solicitudes
-        old_status = getattr(instance, '_old_status', None)
+        # Estado anterior según los valores cargados (sin consultar de nuevo)
+        old_status = instance.get_loaded_value('status')
         current_status = instance.status
         
         # Si cambió de cualquier estado a 'approved', generar cronograma
@@ -992,3 +1320,32 @@ def auto_generate_payment_schedule(sender, instance, created, **kwargs):
                 changed_by=instance.reviewed_by,
                 notes="Cronograma de pagos generado automáticamente"
             )
+
+@receiver(post_save, sender=Payment)
+def apply_verified_payment(sender, instance, created, raw=False, **kwargs):
+    """
+    Marca pagada la cuota programada cuando el pago pasa a verificado (desde
+    mark_as_verified o editando el estado en el admin), o cuando se corrige
+    el monto o la cuota de un pago ya verificado. Los valores cargados dicen
+    qué cambió sin volver a leer el pago.
+    """
+    if raw or instance.status != 'verified' or not instance.payment_schedule_id:
+        return
+    if not (created or instance.has_changed('status') or instance.has_changed('amount')
+            or instance.has_changed('payment_schedule')):
+        return
+    instance.payment_schedule.mark_as_paid(instance.amount, instance.payment_date.date())
+
+@receiver(post_save, sender=PaymentSchedule)
+def update_delinquency_on_save(sender, instance, created, raw=False, **kwargs):
+    """Ajusta el resumen de morosidad cuando una cuota se paga o cambia"""
+    if raw:
+        return
+    from .aging import contribution, loaded_contribution, move_contribution
+    old = None if created else loaded_contribution(instance)
+    move_contribution(instance.application_id, old, contribution(instance))
+
+@receiver(post_delete, sender=PaymentSchedule)
+def update_delinquency_on_delete(sender, instance, **kwargs):
+    from .aging import loaded_contribution, move_contribution
+    move_contribution(instance.application_id, loaded_contribution(instance), None)
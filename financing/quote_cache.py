@@ -0,0 +1,111 @@
+"""
+Caché de cotizaciones de las calculadoras.
+
+Las cotizaciones se guardan en memoria con desalojo LRU. La clave incluye la
+versión de configuración compartida entre workers (ver
+financing/config_version.py), que se incrementa con las señales post_save /
+post_delete de los modelos de catálogo y configuración (ver
+financing/models.py). Antes de cada búsqueda el caché se sincroniza con esa
+versión y descarta sus entradas si cambió; así ningún worker sirve una
+cotización después de que un administrador cambie un precio o una tasa.
+"""
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from . import config_version
+
+
+class QuoteCache:
+    """Caché LRU de cotizaciones con versión de configuración y contadores"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Alinea el caché con la versión compartida; retorna la versión vigente"""
+        version = config_version.current()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self.version = version
+                    self._entries.clear()
+        return version
+
+    def make_key(self, namespace, *parts):
+        """Construye una clave normalizada ligada a la versión vigente"""
+        return (namespace, self.sync()) + tuple(normalize(part) for part in parts)
+
+    def get(self, key):
+        """Retorna la cotización guardada o None"""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Guarda una cotización, desalojando la menos usada si es necesario"""
+        with self._lock:
+            if key[1] != self.version:
+                # Se calculó con una configuración que ya cambió
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bump_version(self):
+        """Invalida las cotizaciones guardadas en todos los workers"""
+        version = config_version.bump()
+        with self._lock:
+            self.version = version
+            self._entries.clear()
+
+    def clear(self):
+        """Vacía el caché de este worker sin cambiar la versión"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores de uso del caché"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+            }
+
+
+def normalize(value):
+    """Normaliza un parámetro para que '30', 30 y 30.0 produzcan la misma clave"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        stripped = value.strip()
+        try:
+            number = Decimal(stripped)
+        except InvalidOperation:
+            return stripped
+        return number if number.is_finite() else stripped
+    return str(value)
+
+
+quote_cache = QuoteCache(max_entries=getattr(settings, 'QUOTE_CACHE_MAX_ENTRIES', 2048))
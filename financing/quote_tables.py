@@ -0,0 +1,115 @@
+"""
+Tablas de cotizaciones precalculadas por producto.
+
+Las cifras "desde $X/mes" del catálogo salen siempre de las mismas pocas
+configuraciones (opciones de la modalidad Crédito Inmediato y planes de
+financiamiento activos). Se materializan en ProductQuote cuando cambia el
+precio de un producto o una modalidad/plan, y el catálogo las lee con una
+búsqueda indexada en lugar de calcularlas en cada solicitud.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from products.models import Product
+from .engine import PERIODS_PER_YEAR, calculate_quotes
+from .models import (
+    CalculatorMode, FinancingConfiguration, FinancingPlan, ProductQuote
+)
+
+
+def get_quote_configurations():
+    """
+    Retorna las configuraciones a materializar como tuplas
+    (modalidad, plan, tasa anual, iniciales, plazos, monto mínimo, monto máximo).
+    """
+    configurations = []
+
+    for mode in CalculatorMode.objects.filter(mode_type='credito', is_active=True):
+        down_payments = mode.get_down_payment_options()
+        terms = mode.get_term_options()
+        if down_payments and terms:
+            configurations.append((mode, None, mode.interest_rate, down_payments, terms, None, None))
+
+    config = FinancingConfiguration.objects.filter(is_active=True).first()
+    available_terms = []
+    if config:
+        available_terms = list(
+            config.financing_terms.filter(is_active=True).values_list('months', flat=True)
+        )
+
+    for plan in FinancingPlan.objects.filter(is_active=True):
+        terms = [months for months in available_terms if months <= plan.max_term_months]
+        configurations.append((
+            None, plan, plan.interest_rate,
+            [plan.min_down_payment_percentage],
+            terms or [plan.max_term_months],
+            plan.min_amount, plan.max_amount
+        ))
+
+    return configurations
+
+
+@transaction.atomic
+def rebuild_product_quotes(product_ids=None):
+    """
+    Recalcula las cotizaciones de los productos indicados (todos si es None).
+
+    Retorna el número de filas generadas.
+    """
+    products = Product.objects.only('id', 'price')
+    quotes_to_delete = ProductQuote.objects.all()
+    if product_ids is not None:
+        products = products.filter(id__in=product_ids)
+        quotes_to_delete = quotes_to_delete.filter(product_id__in=product_ids)
+
+    products = list(products)
+    quotes_to_delete.delete()
+
+    rows = []  # (producto, modalidad, plan)
+    prices, down_payments, terms, frequencies, rates = [], [], [], [], []
+    for mode, plan, rate, plan_down_payments, plan_terms, min_amount, max_amount in get_quote_configurations():
+        for product in products:
+            if min_amount is not None and product.price < min_amount:
+                continue
+            if max_amount is not None and product.price > max_amount:
+                continue
+            for down_payment in plan_down_payments:
+                for term in plan_terms:
+                    for frequency in PERIODS_PER_YEAR:
+                        rows.append((product, mode, plan))
+                        prices.append(product.price)
+                        down_payments.append(down_payment)
+                        terms.append(term)
+                        frequencies.append(frequency)
+                        rates.append(rate)
+
+    if not rows:
+        return 0
+
+    quotes = calculate_quotes(prices, down_payments, terms, frequencies, rates)
+    ProductQuote.objects.bulk_create([
+        ProductQuote(
+            product=product,
+            calculator_mode=mode,
+            financing_plan=plan,
+            down_payment_percentage=quote.down_payment_percentage,
+            term_months=quote.term_months,
+            payment_frequency=quote.payment_frequency,
+            number_of_payments=quote.number_of_payments,
+            down_payment_amount=quote.down_payment_amount,
+            financed_amount=quote.financed_amount,
+            payment_amount=quote.payment_amount,
+            total_amount=quote.total_amount,
+        )
+        for (product, mode, plan), quote in zip(rows, quotes)
+    ], batch_size=1000)
+    return len(rows)
+
+
+def with_monthly_payment_from(queryset):
+    """Anota en un queryset de productos la cuota mensual más baja precalculada"""
+    lowest_monthly = ProductQuote.objects.filter(
+        product=OuterRef('pk'),
+        payment_frequency='monthly'
+    ).order_by('payment_amount').values('payment_amount')[:1]
+    return queryset.annotate(monthly_payment_from=Subquery(lowest_monthly))
@@ -0,0 +1,29 @@
+"""
+Trabajo por bloques de generate_schedules.
+
+Los procesos del pool se crean con 'spawn', así que este módulo no importa
+modelos al cargarse: cada proceso configura Django en init_worker y abre su
+propia conexión a la base de datos en la primera consulta.
+"""
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def generate_chunk(ids):
+    """Genera los cronogramas de un bloque de solicitudes; retorna (escritos, al día, errores)"""
+    from .models import FinancingRequest
+
+    written = unchanged = 0
+    errors = []
+    for request in FinancingRequest.objects.filter(id__in=ids).order_by('id'):
+        try:
+            if request.calculate_payment_schedule():
+                written += 1
+            else:
+                unchanged += 1
+        except Exception as e:
+            errors.append((request.application_number, str(e)))
+    return written, unchanged, errors
@@ -96,7 +96,7 @@ class FinancingRequestDetailSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.user.get_full_name', read_only=True)
     product_details = ProductListSerializer(source='product', read_only=True)
     financing_plan_details = FinancingPlanSerializer(source='financing_plan', read_only=True)
-    payment_schedule = PaymentScheduleSerializer(many=True, read_only=True)
+    payment_schedule = PaymentScheduleSerializer(source='get_payment_schedule', many=True, read_only=True)
     payments = PaymentSerializer(many=True, read_only=True)
     status_history = ApplicationStatusHistorySerializer(many=True, read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
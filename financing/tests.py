@@ -1,3 +1,28 @@
-from django.test import TestCase
+from unittest import skipIf
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import engine
+from .golden_corpus import check_corpus, load_corpus
+
+
+class GoldenCorpusTests(SimpleTestCase):
+    """El motor de amortización debe reproducir exactamente el corpus de referencia"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.corpus = load_corpus()
+
+    def assertNoMismatches(self, mismatches):
+        self.assertEqual(
+            mismatches, [],
+            f"{len(mismatches)} casos difieren del corpus; primeros: {mismatches[:3]}"
+        )
+
+    def test_decimal_path_matches_corpus(self):
+        self.assertNoMismatches(check_corpus(self.corpus, vectorize=False))
+
+    @skipIf(engine.np is None, 'NumPy no está instalado')
+    def test_numpy_path_matches_corpus(self):
+        self.assertNoMismatches(check_corpus(self.corpus, vectorize=True))
@@ -24,11 +24,23 @@ urlpatterns = [
     # Calculadora integrada (nueva)
     path('calculator/config/', views.CalculatorConfigurationView.as_view(), name='calculator-config'),
     path('calculator/calculate/', views.CalculatorCalculateView.as_view(), name='calculator-calculate'),
+    path('calculator/batch/', views.CalculatorBatchView.as_view(), name='calculator-batch'),
+    path('calculator/grid/', views.CalculatorGridView.as_view(), name='calculator-grid'),
+    path('calculator/solve/', views.CalculatorSolveView.as_view(), name='calculator-solve'),
+    path('calculator/cache-stats/', views.CalculatorCacheStatsView.as_view(), name='calculator-cache-stats'),
     
     # Sistema de pagos manuales con comprobantes
     path('payment-methods/', views.PaymentMethodListView.as_view(), name='payment-methods'),
     path('submit-payment/', views.PaymentSubmissionView.as_view(), name='submit-payment'),
     path('my-payments/', views.UserPaymentsView.as_view(), name='user-payments'),
     path('payment-status/<int:payment_id>/', views.PaymentStatusView.as_view(), name='payment-status'),
+    
+    # Subidas reanudables de comprobantes y documentos
+    path('uploads/', views.ChunkedUploadCreateView.as_view(), name='chunked-upload-create'),
+    path('uploads/<uuid:upload_id>/', views.ChunkedUploadView.as_view(), name='chunked-upload'),
+    path('uploads/<uuid:upload_id>/complete/', views.ChunkedUploadCompleteView.as_view(), name='chunked-upload-complete'),
+    
+    # Cobranza
+    path('delinquency/aging/', views.DelinquencyAgingView.as_view(), name='delinquency-aging'),
     # path('upload-attachment/<int:payment_id>/', views.upload_additional_attachment, name='upload-attachment'),  # Comentado temporalmente
 ]
\ No newline at end of file
@@ -1,6 +1,9 @@
 from django.shortcuts import render, get_object_or_404
+from django.http import HttpResponse
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status, generics, permissions
@@ -13,15 +16,28 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+import base64
 import json
 import os
+from datetime import datetime
 
 from .models import (
     FinancingPlan, FinancingRequest, Payment, 
     PaymentSchedule, ApplicationStatusHistory,
     FinancingConfiguration, ProductCategory, SimulatorProduct, HelpText,
-    CalculatorMode, PaymentMethod, CompanyBankAccount  # PaymentAttachment comentado temporalmente
+    CalculatorMode, PaymentMethod, CompanyBankAccount, PaymentFrequency,  # PaymentAttachment comentado temporalmente
+    ChunkedUpload
 )
+from core.conditional import ConditionalGetMixin, not_modified, set_validators
+from . import chunked_uploads
+from .aging import aging_totals
+from .config_payloads import (
+    build_calculator_config, build_payment_methods, build_simulator_config, cached_payload
+)
+from .engine import calculate_grid, calculate_quote, calculate_quotes, get_periods_per_year
+from .forecast import MAX_MONTHS as FORECAST_MAX_MONTHS, PERCENTILES, forecast_adjudication
+from .quote_cache import quote_cache
+from .virtual_schedule import SCHEDULED_STATUSES, virtual_schedules_enabled
 from .serializers.financing_serializers import (
     FinancingPlanSerializer,
     FinancingRequestListSerializer,
@@ -37,12 +53,47 @@ from notifications.models import EmailNotification
 from products.models import Product, Category
 
 
-class FinancingPlanViewSet(viewsets.ReadOnlyModelViewSet):
+
+def resolve_product(product_id):
+    """
+    (datos del producto, precio) para las calculadoras, o (None, None) si no
+    se indicó producto o no existe. Se memoriza en quote_cache, que se
+    invalida al guardar o borrar un producto.
+    """
+    if not product_id:
+        return None, None
+    key = quote_cache.make_key('product', product_id)
+    cached = quote_cache.get(key)
+    if cached is None:
+        try:
+            product = Product.objects.select_related('category').filter(id=product_id).first()
+        except (ValueError, TypeError):
+            product = None
+        cached = (None, None) if product is None else ({
+            'id': product.id,
+            'name': product.name,
+            'price': float(product.price),
+            'brand': product.brand,
+            'category': product.category.name
+        }, product.price)
+        quote_cache.set(key, cached)
+    product_data, price = cached
+    return (dict(product_data) if product_data else None), price
+
+class FinancingPlanViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet para planes de financiamiento"""
     queryset = FinancingPlan.objects.filter(is_active=True)
     serializer_class = FinancingPlanSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
+    
+    def get_conditional_state(self):
+        # Se cuentan todos los planes para detectar también las desactivaciones.
+        # Sin Last-Modified: un plan borrado no mueve el updated_at máximo
+        plans = FinancingPlan.objects.aggregate(
+            count=Count('id'), active=Count('id', filter=Q(is_active=True)), last=Max('updated_at')
+        )
+        return (plans['count'], plans['active'], plans['last']), None
 
 
 class FinancingRequestViewSet(viewsets.ModelViewSet):
@@ -166,7 +217,7 @@ class FinancingRequestViewSet(viewsets.ModelViewSet):
     def payment_schedule(self, request, pk=None):
         """Obtener calendario de pagos"""
         application = self.get_object()
-        schedules = application.payment_schedule.all()
+        schedules = application.get_payment_schedule()
         serializer = PaymentScheduleSerializer(schedules, many=True)
         return Response(serializer.data)
     
@@ -237,6 +288,18 @@ class FinancingCalculatorView(APIView):
     
     def post(self, request):
         """Calcular plan de financiamiento"""
+        cache_key = quote_cache.make_key(
+            'financing',
+            request.data.get('product_id'),
+            request.data.get('financing_plan_id'),
+            request.data.get('down_payment_percentage'),
+            request.data.get('payment_frequency'),
+            request.data.get('term_months')
+        )
+        cached = quote_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+        
         serializer = FinancingCalculatorSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -247,66 +310,45 @@ class FinancingCalculatorView(APIView):
         payment_frequency = serializer.validated_data['payment_frequency']
         term_months = serializer.validated_data['term_months']
         
-        # Calcular montos
-        product_price = Decimal(str(product.price))
-        down_payment_amount = product_price * Decimal(str(down_payment_percentage)) / 100
-        financed_amount = product_price - down_payment_amount
-        
-        # Calcular interés
-        annual_rate = Decimal(str(plan.interest_rate))
-        monthly_rate = annual_rate / 12 / 100
-        
-        # Calcular número de pagos según frecuencia
-        if payment_frequency == 'weekly':
-            number_of_payments = term_months * 4
-            period_rate = monthly_rate / 4
-        elif payment_frequency == 'biweekly':
-            number_of_payments = term_months * 2
-            period_rate = monthly_rate / 2
-        else:  # monthly
-            number_of_payments = term_months
-            period_rate = monthly_rate
-        
-        # Calcular cuota usando la fórmula de amortización
-        if period_rate > 0:
-            payment_amount = financed_amount * (
-                period_rate * (1 + period_rate) ** number_of_payments
-            ) / ((1 + period_rate) ** number_of_payments - 1)
-        else:
-            payment_amount = financed_amount / number_of_payments
-        
-        # Calcular totales
-        total_amount = down_payment_amount + (payment_amount * number_of_payments)
-        total_interest = total_amount - product_price
+        # Calcular cuota con el motor de amortización
+        quote = calculate_quote(
+            product.price,
+            down_payment_percentage,
+            term_months,
+            payment_frequency,
+            plan.interest_rate
+        )
         
         # Preparar respuesta
         result = {
             'product': {
                 'id': product.id,
                 'name': product.name,
-                'price': float(product_price),
+                'price': float(quote.product_price),
                 'image': product.image.url if product.image else None
             },
             'financing_plan': {
                 'id': plan.id,
                 'name': plan.name,
-                'interest_rate': float(annual_rate)
+                'interest_rate': float(quote.annual_rate)
             },
             'calculation': {
-                'product_price': float(product_price),
+                'product_price': float(quote.product_price),
                 'down_payment_percentage': down_payment_percentage,
-                'down_payment_amount': float(down_payment_amount),
-                'financed_amount': float(financed_amount),
+                'down_payment_amount': float(quote.down_payment_amount),
+                'financed_amount': float(quote.financed_amount),
                 'payment_frequency': payment_frequency,
                 'payment_frequency_display': dict(FinancingRequest.PAYMENT_FREQUENCIES)[payment_frequency],
                 'term_months': term_months,
-                'number_of_payments': number_of_payments,
-                'payment_amount': float(payment_amount),
-                'total_interest': float(total_interest),
-                'total_amount': float(total_amount)
+                'number_of_payments': quote.number_of_payments,
+                'payment_amount': float(quote.payment_amount),
+                'last_payment_amount': float(quote.last_payment_amount),
+                'total_interest': float(quote.total_interest),
+                'total_amount': float(quote.total_amount)
             }
         }
         
+        quote_cache.set(cache_key, result)
         return Response(result, status=status.HTTP_200_OK)
 
 
@@ -327,10 +369,24 @@ class PaymentScheduleListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return PaymentSchedule.objects.filter(
-            application__customer__user=self.request.user,
-            is_paid=False
-        ).order_by('due_date')
+        if not virtual_schedules_enabled():
+            return PaymentSchedule.objects.filter(
+                application__customer__user=self.request.user,
+                is_paid=False
+            ).order_by('due_date')
+        
+        # Con cronogramas virtuales las cuotas se calculan por solicitud
+        applications = FinancingRequest.objects.filter(
+            Q(status__in=SCHEDULED_STATUSES) | Q(payment_schedule__isnull=False),
+            customer__user=self.request.user
+        ).distinct().prefetch_related('payment_schedule')
+        schedules = [
+            item
+            for application in applications
+            for item in application.get_payment_schedule()
+            if not item.is_paid
+        ]
+        return sorted(schedules, key=lambda item: item.due_date)
 
 
 class SimulatorConfigurationView(APIView):
@@ -339,64 +395,17 @@ class SimulatorConfigurationView(APIView):
     
     def get(self, request):
         try:
-            # Obtener configuración activa
-            config = FinancingConfiguration.objects.filter(is_active=True).first()
-            if not config:
+            # Payload pre-serializado; se reconstruye al cambiar la configuración
+            content, etag = cached_payload('simulator', build_simulator_config)
+            if content is None:
                 return Response({
                     'error': 'No hay configuración activa'
                 }, status=status.HTTP_404_NOT_FOUND)
             
-            # Obtener opciones de inicial
-            down_payments = config.down_payment_options.filter(is_active=True).values(
-                'percentage', 'order'
-            )
-            
-            # Obtener plazos
-            terms = config.financing_terms.filter(is_active=True).values(
-                'months', 'order'
+            return not_modified(request, etag) or set_validators(
+                HttpResponse(content, content_type='application/json'), etag
             )
             
-            # Obtener frecuencias
-            frequencies = []
-            for freq in config.payment_frequencies.filter(is_active=True):
-                frequencies.append({
-                    'value': freq.frequency,
-                    'label': freq.get_frequency_display(),
-                    'order': freq.order
-                })
-            
-            # Obtener productos reales del catálogo
-            categories = []
-            for category in Category.objects.all():
-                products = Product.objects.filter(
-                    category=category,
-                    stock__gt=0  # Solo productos con stock
-                ).values('id', 'name', 'price', 'description', 'brand')
-                
-                if products:
-                    categories.append({
-                        'id': category.id,
-                        'name': category.name,
-                        'slug': category.slug,
-                        'products': list(products)
-                    })
-            
-            # Obtener textos de ayuda
-            help_texts = {}
-            for help_text in HelpText.objects.filter(is_active=True):
-                help_texts[help_text.section] = {
-                    'title': help_text.title,
-                    'content': help_text.content
-                }
-            
-            return Response({
-                'down_payment_options': list(down_payments),
-                'financing_terms': list(terms),
-                'payment_frequencies': frequencies,
-                'categories': categories,
-                'help_texts': help_texts
-            })
-            
         except Exception as e:
             return Response({
                 'error': str(e)
@@ -416,61 +425,52 @@ class SimulatorCalculateView(APIView):
             term_months = int(request.data.get('term_months', 12))
             payment_frequency = request.data.get('payment_frequency', 'monthly')
             
-            # Si hay product_id, obtener el producto real
-            product_data = None
-            if product_id:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    product_data = {
-                        'id': product.id,
-                        'name': product.name,
-                        'price': float(product.price),
-                        'brand': product.brand,
-                        'category': product.category.name
-                    }
-                    product_price = product.price
-                except Product.DoesNotExist:
-                    pass
-            
-            # Calcular montos
-            down_payment_amount = product_price * down_payment_percentage / 100
-            financed_amount = product_price - down_payment_amount
+            # El producto se resuelve antes de armar la clave: si no existe se
+            # calcula con product_price, que entonces debe distinguir la entrada
+            product_data, price = resolve_product(product_id)
+            if price is not None:
+                product_price = price
             
-            # Calcular número de pagos según frecuencia
-            if payment_frequency == 'weekly':
-                payments_per_month = Decimal('4.33')  # 52/12
-                number_of_payments = int(term_months * payments_per_month)
-            elif payment_frequency == 'biweekly':
-                payments_per_month = Decimal('2.17')  # 26/12
-                number_of_payments = int(term_months * payments_per_month)
-            else:  # monthly
-                payments_per_month = 1
-                number_of_payments = term_months
+            cache_key = quote_cache.make_key(
+                'simulator',
+                product_data and product_data['id'],
+                product_price,
+                down_payment_percentage,
+                term_months,
+                payment_frequency
+            )
+            cached = quote_cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
             
-            # Calcular monto por pago (sin intereses)
-            if number_of_payments > 0:
-                payment_amount = financed_amount / number_of_payments
-            else:
-                payment_amount = 0
+            # Calcular cuota con el motor de amortización (sin intereses)
+            quote = calculate_quote(
+                product_price,
+                down_payment_percentage,
+                term_months,
+                payment_frequency
+            )
             
             # Preparar respuesta
             calculation = {
                 'product': product_data,
                 'calculation': {
-                    'product_price': float(product_price),
-                    'down_payment_percentage': float(down_payment_percentage),
-                    'down_payment_amount': float(down_payment_amount),
-                    'financed_amount': float(financed_amount),
+                    'product_price': float(quote.product_price),
+                    'down_payment_percentage': float(quote.down_payment_percentage),
+                    'down_payment_amount': float(quote.down_payment_amount),
+                    'financed_amount': float(quote.financed_amount),
                     'term_months': term_months,
                     'payment_frequency': payment_frequency,
                     'payment_frequency_display': dict(PaymentFrequency.FREQUENCY_CHOICES).get(payment_frequency, payment_frequency),
-                    'number_of_payments': number_of_payments,
-                    'payment_amount': float(payment_amount),
+                    'number_of_payments': quote.number_of_payments,
+                    'payment_amount': float(quote.payment_amount),
+                    'last_payment_amount': float(quote.last_payment_amount),
                     'total_interest': 0,  # Sin intereses
-                    'total_amount': float(product_price)
+                    'total_amount': float(quote.product_price)
                 }
             }
             
+            quote_cache.set(cache_key, calculation)
             return Response(calculation)
             
         except Exception as e:
@@ -485,56 +485,11 @@ class CalculatorConfigurationView(APIView):
     
     def get(self, request):
         try:
-            # Obtener modalidades activas
-            modes = CalculatorMode.objects.filter(is_active=True).order_by('order')
-            
-            # Obtener productos del catálogo real agrupados por categoría
-            categories = []
-            for category in Category.objects.all():
-                products = Product.objects.filter(
-                    category=category,
-                    stock__gt=0  # Solo productos con stock
-                ).values('id', 'name', 'price', 'description', 'brand')
-                
-                if products:
-                    categories.append({
-                        'id': category.id,
-                        'name': category.name,
-                        'slug': category.slug,
-                        'products': list(products)
-                    })
-            
-            # Preparar configuración de modalidades
-            modes_config = []
-            for mode in modes:
-                mode_data = {
-                    'id': mode.id,
-                    'name': mode.name,
-                    'mode_type': mode.mode_type,
-                    'description': mode.description,
-                    'order': mode.order
-                }
-                
-                if mode.mode_type == 'programada':
-                    mode_data.update({
-                        'adjudication_percentage': float(mode.adjudication_percentage),
-                        'initial_fee_percentage': float(mode.initial_fee_percentage),
-                        'min_initial_contribution': float(mode.min_initial_contribution),
-                        'max_initial_contribution': float(mode.max_initial_contribution)
-                    })
-                elif mode.mode_type == 'credito':
-                    mode_data.update({
-                        'down_payment_options': mode.get_down_payment_options(),
-                        'term_options': mode.get_term_options(),
-                        'interest_rate': float(mode.interest_rate)
-                    })
-                
-                modes_config.append(mode_data)
-            
-            return Response({
-                'modes': modes_config,
-                'categories': categories
-            })
+            # Payload pre-serializado; se reconstruye al cambiar la configuración
+            content, etag = cached_payload('calculator', build_calculator_config)
+            return not_modified(request, etag) or set_validators(
+                HttpResponse(content, content_type='application/json'), etag
+            )
             
         except Exception as e:
             return Response({
@@ -546,6 +501,12 @@ class CalculatorCalculateView(APIView):
     """Vista para calcular financiamiento con las modalidades configurables"""
     permission_classes = [permissions.AllowAny]
     
+    # Parámetros que determinan el resultado de cada modalidad
+    CACHE_FIELDS = {
+        'programada': ('initial_contribution_percentage', 'monthly_payment', 'punctuality', 'forecast'),
+        'credito': ('down_payment_percentage', 'term_months', 'payment_frequency'),
+    }
+    
     @method_decorator(csrf_exempt)
     def post(self, request):
         try:
@@ -554,45 +515,54 @@ class CalculatorCalculateView(APIView):
             product_id = request.data.get('product_id')
             product_price = Decimal(str(request.data.get('product_price', 0)))
             
-            # Obtener configuración de la modalidad
-            try:
-                mode = CalculatorMode.objects.get(mode_type=mode_type, is_active=True)
-            except CalculatorMode.DoesNotExist:
-                return Response({
-                    'error': f'Modalidad {mode_type} no encontrada o inactiva'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # Sin producto válido se calcula con product_price (ver resolve_product)
+            product_data, price = resolve_product(product_id)
+            if price is not None:
+                product_price = price
             
-            # Si hay product_id, obtener el producto real
-            product_data = None
-            if product_id:
-                try:
-                    product = Product.objects.get(id=product_id)
-                    product_data = {
-                        'id': product.id,
-                        'name': product.name,
-                        'price': float(product.price),
-                        'brand': product.brand,
-                        'category': product.category.name
-                    }
-                    product_price = product.price
-                except Product.DoesNotExist:
-                    pass
+            # Las fechas estimadas dependen del día, por eso forma parte de la clave
+            cache_key = quote_cache.make_key(
+                'calculator',
+                mode_type,
+                product_data and product_data['id'],
+                product_price,
+                timezone.localdate(),
+                *(request.data.get(field) for field in self.CACHE_FIELDS.get(mode_type, ()))
+            )
+            cached = quote_cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
             
-            # Calcular según la modalidad
-            if mode_type == 'programada':
-                return self._calculate_programada(mode, product_data, product_price, request.data)
-            elif mode_type == 'credito':
-                return self._calculate_credito(mode, product_data, product_price, request.data)
-            else:
-                return Response({
-                    'error': 'Modalidad no soportada'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            response = self._calculate(mode_type, product_data, product_price, request.data)
+            if response.status_code == status.HTTP_200_OK:
+                quote_cache.set(cache_key, response.data)
+            return response
                 
         except Exception as e:
             return Response({
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    def _calculate(self, mode_type, product_data, product_price, data):
+        """Obtiene la modalidad y calcula la cotización"""
+        # Obtener configuración de la modalidad
+        try:
+            mode = CalculatorMode.objects.get(mode_type=mode_type, is_active=True)
+        except CalculatorMode.DoesNotExist:
+            return Response({
+                'error': f'Modalidad {mode_type} no encontrada o inactiva'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Calcular según la modalidad
+        if mode_type == 'programada':
+            return self._calculate_programada(mode, product_data, product_price, data)
+        elif mode_type == 'credito':
+            return self._calculate_credito(mode, product_data, product_price, data)
+        else:
+            return Response({
+                'error': 'Modalidad no soportada'
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
     def _calculate_programada(self, mode, product_data, product_price, data):
         """Calcular modalidad Compra Programada"""
         initial_contribution_percentage = Decimal(str(data.get('initial_contribution_percentage', mode.min_initial_contribution)))
@@ -635,7 +605,7 @@ class CalculatorCalculateView(APIView):
         final_months = max(1, months_to_adjudication - reduced_months)
         
         # Fechas estimadas
-        from datetime import date, timedelta
+        from datetime import timedelta
         try:
             from dateutil.relativedelta import relativedelta
         except ImportError:
@@ -643,34 +613,50 @@ class CalculatorCalculateView(APIView):
             def relativedelta(months=0):
                 return timedelta(days=months * 30)
         
-        today = date.today()
+        today = timezone.localdate()
         estimated_adjudication = today + relativedelta(months=months_to_adjudication)
         final_adjudication = today + relativedelta(months=final_months)
         
+        calculation = {
+            'vehicle_value': float(product_price),
+            'initial_fee': float(initial_fee),
+            'initial_contribution': float(initial_contribution),
+            'amount_to_finance': float(amount_to_finance),
+            'monthly_payment': float(monthly_payment),
+            'post_adjudication_amount': float(post_adjudication_amount),
+            'months_to_adjudication': months_to_adjudication,
+            'estimated_adjudication_date': estimated_adjudication.strftime('%d/%m/%Y'),
+            'accumulated_points': total_points,
+            'reduced_months': reduced_months,
+            'final_adjudication_date': final_adjudication.strftime('%d/%m/%Y'),
+            'adjudication_percentage': float(mode.adjudication_percentage)
+        }
+        
+        # Pronóstico probabilístico opcional (P10/P50/P90)
+        if str(data.get('forecast', '')).lower() in ('1', 'true', 'yes'):
+            forecast = forecast_adjudication(months_to_adjudication, punctuality)
+            if forecast is None:
+                calculation['forecast'] = {
+                    'error': f'El pronóstico sólo está disponible hasta {FORECAST_MAX_MONTHS} meses de aportes'
+                }
+            else:
+                forecast = dict(forecast)
+                for percentile in PERCENTILES:
+                    months = forecast[f'p{percentile}_months']
+                    forecast[f'p{percentile}_date'] = (today + relativedelta(months=months)).strftime('%d/%m/%Y')
+                calculation['forecast'] = forecast
+        
         return Response({
             'mode': {
                 'name': mode.name,
                 'type': mode.mode_type
             },
             'product': product_data,
-            'calculation': {
-                'vehicle_value': float(product_price),
-                'initial_fee': float(initial_fee),
-                'initial_contribution': float(initial_contribution),
-                'amount_to_finance': float(amount_to_finance),
-                'monthly_payment': float(monthly_payment),
-                'post_adjudication_amount': float(post_adjudication_amount),
-                'months_to_adjudication': months_to_adjudication,
-                'estimated_adjudication_date': estimated_adjudication.strftime('%d/%m/%Y'),
-                'accumulated_points': total_points,
-                'reduced_months': reduced_months,
-                'final_adjudication_date': final_adjudication.strftime('%d/%m/%Y'),
-                'adjudication_percentage': float(mode.adjudication_percentage)
-            }
+            'calculation': calculation
         })
     
-    def _calculate_credito(self, mode, product_data, product_price, data):
-        """Calcular modalidad Crédito Inmediato"""
+    def _credito_params(self, mode, data):
+        """Valida los parámetros de Crédito Inmediato; retorna (parámetros, error)"""
         down_payment_percentage = Decimal(str(data.get('down_payment_percentage', 30)))
         term_months = int(data.get('term_months', 12))
         payment_frequency = data.get('payment_frequency', 'monthly')
@@ -680,50 +666,30 @@ class CalculatorCalculateView(APIView):
         available_terms = mode.get_term_options()
         
         if available_down_payments and float(down_payment_percentage) not in available_down_payments:
-            return Response({
-                'error': f'Porcentaje de inicial no disponible. Opciones: {available_down_payments}'
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return None, f'Porcentaje de inicial no disponible. Opciones: {available_down_payments}'
         
         if available_terms and term_months not in available_terms:
-            return Response({
-                'error': f'Plazo no disponible. Opciones: {available_terms}'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Calcular valores
-        down_payment_amount = product_price * down_payment_percentage / 100
-        financed_amount = product_price - down_payment_amount
+            return None, f'Plazo no disponible. Opciones: {available_terms}'
         
-        # Calcular número de pagos según frecuencia
-        if payment_frequency == 'weekly':
-            payments_per_month = Decimal('4.33')  # 52 semanas / 12 meses
-            number_of_payments = int(term_months * payments_per_month)
-            period_rate_divisor = 52  # 52 semanas por año
-        elif payment_frequency == 'biweekly':
-            payments_per_month = Decimal('2.17')  # 26 quincenas / 12 meses
-            number_of_payments = int(term_months * payments_per_month)
-            period_rate_divisor = 26  # 26 quincenas por año
-        else:  # monthly
-            payments_per_month = 1
-            number_of_payments = term_months
-            period_rate_divisor = 12  # 12 meses por año
-        
-        # Calcular cuota según frecuencia
-        annual_rate = mode.interest_rate / 100
-        if annual_rate > 0:
-            period_rate = annual_rate / period_rate_divisor
-            payment_amount = financed_amount * (
-                period_rate * (1 + period_rate) ** number_of_payments
-            ) / ((1 + period_rate) ** number_of_payments - 1)
-        else:
-            payment_amount = financed_amount / number_of_payments
+        return (down_payment_percentage, term_months, payment_frequency), None
+    
+    def _calculate_credito(self, mode, product_data, product_price, data, quote=None):
+        """Calcular modalidad Crédito Inmediato (quote permite pasar una cotización ya calculada)"""
+        if quote is None:
+            params, error = self._credito_params(mode, data)
+            if error:
+                return Response({
+                    'error': error
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Calcular cuota con el motor de amortización
+            quote = calculate_quote(product_price, *params, mode.interest_rate)
         
-        # Calcular totales
-        total_payments = payment_amount * number_of_payments
-        total_cost = down_payment_amount + total_payments
-        total_interest = total_cost - product_price
+        term_months = quote.term_months
+        payment_frequency = quote.payment_frequency
         
         # Fechas
-        from datetime import date, timedelta
+        from datetime import timedelta
         try:
             from dateutil.relativedelta import relativedelta
         except ImportError:
@@ -731,7 +697,7 @@ class CalculatorCalculateView(APIView):
             def relativedelta(months=0):
                 return timedelta(days=months * 30)
         
-        today = date.today()
+        today = timezone.localdate()
         
         # Calcular fecha del primer pago según frecuencia
         if payment_frequency == 'weekly':
@@ -757,18 +723,19 @@ class CalculatorCalculateView(APIView):
             },
             'product': product_data,
             'calculation': {
-                'vehicle_value': float(product_price),
-                'down_payment_amount': float(down_payment_amount),
-                'down_payment_percentage': float(down_payment_percentage),
-                'financed_amount': float(financed_amount),
+                'vehicle_value': float(quote.product_price),
+                'down_payment_amount': float(quote.down_payment_amount),
+                'down_payment_percentage': float(quote.down_payment_percentage),
+                'financed_amount': float(quote.financed_amount),
                 'term_months': term_months,
                 'payment_frequency': payment_frequency,
                 'payment_frequency_display': frequency_names.get(payment_frequency, 'mensual'),
-                'number_of_payments': number_of_payments,
-                'payment_amount': float(payment_amount),
-                'monthly_payment': float(payment_amount),  # Para compatibilidad con frontend
-                'total_cost': float(total_cost),
-                'total_interest': float(total_interest),
+                'number_of_payments': quote.number_of_payments,
+                'payment_amount': float(quote.payment_amount),
+                'last_payment_amount': float(quote.last_payment_amount),
+                'monthly_payment': float(quote.payment_amount),  # Para compatibilidad con frontend
+                'total_cost': float(quote.total_amount),
+                'total_interest': float(quote.total_interest),
                 'interest_rate': float(mode.interest_rate),
                 'first_payment_date': first_payment_date.strftime('%d/%m/%Y'),
                 'payoff_date': payoff_date.strftime('%d/%m/%Y')
@@ -776,56 +743,424 @@ class CalculatorCalculateView(APIView):
         })
 
 
-class PaymentMethodListView(APIView):
-    """Lista de métodos de pago disponibles"""
-    permission_classes = [permissions.IsAuthenticated]
+class CalculatorBatchView(CalculatorCalculateView):
+    """Vista para calcular muchos escenarios (producto, modalidad, parámetros) en una sola llamada"""
+    max_scenarios = 300
     
-    def get(self, request):
-        methods = PaymentMethod.objects.filter(is_active=True).order_by('order')
-        
-        data = []
-        for method in methods:
-            method_data = {
-                'id': method.id,
-                'name': method.name,
-                'payment_type': method.payment_type,
-                'description': method.description,
-                'instructions': method.instructions,
-                'requires_reference': method.requires_reference,
-                'requires_receipt': method.requires_receipt,
-                'min_amount': float(method.min_amount) if method.min_amount else None,
-                'max_amount': float(method.max_amount) if method.max_amount else None,
-                'processing_time_hours': method.processing_time_hours,
-                'accounts': []
+    @method_decorator(csrf_exempt)
+    def post(self, request):
+        try:
+            scenarios = request.data.get('scenarios')
+            if not isinstance(scenarios, list) or not scenarios:
+                return Response({
+                    'error': 'Debe enviar una lista de escenarios en "scenarios"'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if len(scenarios) > self.max_scenarios:
+                return Response({
+                    'error': f'Máximo {self.max_scenarios} escenarios por solicitud'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Cada escenario se valida por separado: uno inválido recibe su
+            # error en results sin afectar al resto del lote
+            results = [None] * len(scenarios)
+            valid = []  # (índice, datos, product_id)
+            for index, scenario in enumerate(scenarios):
+                if not isinstance(scenario, dict):
+                    results[index] = {'error': 'Cada escenario debe ser un objeto'}
+                    continue
+                
+                # Los parámetros pueden venir anidados en "params" o al mismo nivel
+                params = scenario.get('params', {})
+                if not isinstance(params, dict):
+                    results[index] = {'error': 'Los parámetros ("params") deben ser un objeto'}
+                    continue
+                data = dict(scenario, **params)
+                
+                mode_type = data.get('mode_type', data.get('mode'))
+                if not isinstance(mode_type, str):
+                    results[index] = {'error': 'Debe indicar la modalidad ("mode_type")'}
+                    continue
+                
+                product_id = None
+                if data.get('product_id'):
+                    try:
+                        product_id = int(data['product_id'])
+                    except (ValueError, TypeError):
+                        results[index] = {'error': f'Producto no válido: {data["product_id"]}'}
+                        continue
+                valid.append((index, data, product_id))
+            
+            # Dos consultas en total: productos y modalidades
+            products = Product.objects.select_related('category').in_bulk(
+                {product_id for _, _, product_id in valid if product_id is not None}
+            )
+            modes = {
+                mode.mode_type: mode
+                for mode in CalculatorMode.objects.filter(
+                    mode_type__in={data.get('mode_type', data.get('mode')) for _, data, _ in valid},
+                    is_active=True
+                )
             }
             
-            # Obtener cuentas asociadas al método
-            accounts = CompanyBankAccount.objects.filter(
-                payment_methods=method,
-                is_active=True
+            pending = []  # Escenarios de crédito que se calculan en lote
+            
+            for index, data, product_id in valid:
+                mode_type = data.get('mode_type', data.get('mode'))
+                mode = modes.get(mode_type)
+                if mode is None:
+                    results[index] = {'error': f'Modalidad {mode_type} no encontrada o inactiva'}
+                    continue
+                
+                try:
+                    product_data = None
+                    product_price = Decimal(str(data.get('product_price', 0)))
+                    product = products.get(product_id) if product_id is not None else None
+                    if product:
+                        product_data = {
+                            'id': product.id,
+                            'name': product.name,
+                            'price': float(product.price),
+                            'brand': product.brand,
+                            'category': product.category.name
+                        }
+                        product_price = product.price
+                    
+                    if mode_type == 'programada':
+                        response = self._calculate_programada(mode, product_data, product_price, data)
+                        results[index] = response.data
+                    else:
+                        params, error = self._credito_params(mode, data)
+                        if error:
+                            results[index] = {'error': error}
+                        else:
+                            pending.append((index, mode, product_data, product_price, data, params))
+                except (ValueError, TypeError, ArithmeticError):
+                    results[index] = {'error': 'Parámetros numéricos no válidos'}
+            
+            # Calcular todas las cotizaciones de crédito en una sola pasada
+            if pending:
+                quotes = calculate_quotes(
+                    [item[3] for item in pending],
+                    [item[5][0] for item in pending],
+                    [item[5][1] for item in pending],
+                    [item[5][2] for item in pending],
+                    [item[1].interest_rate for item in pending]
+                )
+                for (index, mode, product_data, product_price, data, params), quote in zip(pending, quotes):
+                    response = self._calculate_credito(mode, product_data, product_price, data, quote=quote)
+                    results[index] = response.data
+            
+            return Response({
+                'count': len(results),
+                'results': results
+            })
+            
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CalculatorSolveView(APIView):
+    """
+    Calculadora inversa: a partir de la cuota mensual que el cliente puede
+    pagar, busca las combinaciones de inicial, plazo y frecuencia más cercanas.
+    
+    Recorre en un solo lote las opciones de Crédito Inmediato y de los planes
+    de financiamiento activos que admiten el precio del producto.
+    """
+    permission_classes = [permissions.AllowAny]
+    default_limit = 10
+    max_limit = 50
+    
+    @method_decorator(csrf_exempt)
+    def post(self, request):
+        try:
+            product_id = request.data.get('product_id')
+            product_price = Decimal(str(request.data.get('product_price', 0)))
+            target_payment = Decimal(str(request.data.get('target_monthly_payment', 0)))
+            try:
+                limit = max(1, min(int(request.data.get('limit', self.default_limit)), self.max_limit))
+            except (ValueError, TypeError):
+                return Response({
+                    'error': 'El parámetro limit debe ser un número entero'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            if target_payment <= 0:
+                return Response({
+                    'error': 'Debe indicar una cuota mensual objetivo mayor a cero'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            product_data, price = resolve_product(product_id)
+            if product_id and product_data is None:
+                return Response({
+                    'error': 'Producto no encontrado'
+                }, status=status.HTTP_404_NOT_FOUND)
+            if price is not None:
+                product_price = price
+            
+            cache_key = quote_cache.make_key(
+                'solve',
+                product_data and product_data['id'],
+                product_price,
+                target_payment,
+                limit
             )
+            cached = quote_cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
             
-            for account in accounts:
-                account_data = {
-                    'id': account.id,
-                    'bank_name': account.bank_name,
-                    'account_type': account.get_account_type_display(),
-                    'account_number': account.account_number,
-                    'account_holder': account.account_holder,
-                    'currency': account.currency,
-                    'instructions': account.instructions,
-                    'is_default': account.is_default
-                }
-                method_data['accounts'].append(account_data)
+            if product_price <= 0:
+                return Response({
+                    'error': 'Debe indicar un producto o un precio válido'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            candidates = self._candidates(product_price)
+            if not candidates:
+                return Response({
+                    'error': 'No hay opciones de financiamiento disponibles para este precio'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Todas las combinaciones en una sola pasada del motor
+            sources, down_payments, terms, frequencies, rates = (list(column) for column in zip(*candidates))
+            quotes = calculate_quotes(product_price, down_payments, terms, frequencies, rates)
+            
+            matches = []
+            for source, quote in zip(sources, quotes):
+                # Cuota llevada a su equivalente mensual para comparar frecuencias
+                monthly_equivalent = (
+                    quote.payment_amount * get_periods_per_year(quote.payment_frequency) / 12
+                ).quantize(Decimal('0.01'))
+                matches.append((
+                    monthly_equivalent > target_payment,
+                    abs(monthly_equivalent - target_payment),
+                    quote.total_amount,
+                    source,
+                    quote,
+                    monthly_equivalent
+                ))
+            
+            # Primero las que caben en el presupuesto, luego las más cercanas y
+            # a igual distancia las de menor costo total
+            matches.sort(key=lambda match: match[:3])
+            
+            result = {
+                'product': product_data,
+                'vehicle_value': float(product_price),
+                'target_monthly_payment': float(target_payment),
+                'evaluated': len(matches),
+                'matches': [
+                    {
+                        'source': source,
+                        'affordable': not over_budget,
+                        'monthly_equivalent': float(monthly_equivalent),
+                        'difference': float(monthly_equivalent - target_payment),
+                        'down_payment_percentage': float(quote.down_payment_percentage),
+                        'term_months': quote.term_months,
+                        'payment_frequency': quote.payment_frequency,
+                        'down_payment_amount': float(quote.down_payment_amount),
+                        'financed_amount': float(quote.financed_amount),
+                        'number_of_payments': quote.number_of_payments,
+                        'payment_amount': float(quote.payment_amount),
+                        'last_payment_amount': float(quote.last_payment_amount),
+                        'interest_rate': float(quote.annual_rate),
+                        'total_cost': float(quote.total_amount),
+                        'total_interest': float(quote.total_interest)
+                    }
+                    for over_budget, distance, total, source, quote, monthly_equivalent in matches[:limit]
+                ]
+            }
+            
+            quote_cache.set(cache_key, result)
+            return Response(result)
             
-            data.append(method_data)
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def _candidates(self, product_price):
+        """Combinaciones (origen, inicial, plazo, frecuencia, tasa) factibles para el precio"""
+        all_frequencies = [value for value, label in FinancingRequest.PAYMENT_FREQUENCIES]
+        candidates = []
+        
+        mode = CalculatorMode.objects.filter(mode_type='credito', is_active=True).first()
+        if mode:
+            source = {'type': 'credito', 'id': mode.id, 'name': mode.name}
+            for down_payment in mode.get_down_payment_options():
+                for term in mode.get_term_options():
+                    for frequency in all_frequencies:
+                        candidates.append((source, down_payment, term, frequency, mode.interest_rate))
         
+        config = FinancingConfiguration.objects.filter(is_active=True).prefetch_related(
+            'down_payment_options', 'financing_terms', 'payment_frequencies'
+        ).first()
+        config_down_payments, config_terms, config_frequencies = [], [], []
+        if config:
+            config_down_payments = [option.percentage for option in config.down_payment_options.all() if option.is_active]
+            config_terms = [term.months for term in config.financing_terms.all() if term.is_active]
+            config_frequencies = [option.frequency for option in config.payment_frequencies.all() if option.is_active]
+        
+        plans = FinancingPlan.objects.filter(
+            is_active=True,
+            min_amount__lte=product_price,
+            max_amount__gte=product_price
+        )
+        for plan in plans:
+            source = {'type': 'plan', 'id': plan.id, 'name': plan.name}
+            down_payments = [
+                percentage for percentage in config_down_payments
+                if percentage >= plan.min_down_payment_percentage
+            ] or [plan.min_down_payment_percentage]
+            terms = [months for months in config_terms if months <= plan.max_term_months] or [plan.max_term_months]
+            for down_payment in down_payments:
+                for term in terms:
+                    for frequency in config_frequencies or all_frequencies:
+                        candidates.append((source, down_payment, term, frequency, plan.interest_rate))
+        
+        return candidates
+
+
+class CalculatorGridView(APIView):
+    """Vista que retorna todas las combinaciones de cuotas de una modalidad en una sola llamada"""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            mode_type = request.GET.get('mode_type', 'credito')
+            product_id = request.GET.get('product_id')
+            product_price = Decimal(str(request.GET.get('product_price', 0)))
+
+            product_data, price = resolve_product(product_id)
+            if product_id and product_data is None:
+                return Response({
+                    'error': 'Producto no encontrado'
+                }, status=status.HTTP_404_NOT_FOUND)
+            if price is not None:
+                product_price = price
+            
+            cache_key = quote_cache.make_key(
+                'grid',
+                mode_type,
+                product_data and product_data['id'],
+                product_price
+            )
+            cached = quote_cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
+
+            try:
+                mode = CalculatorMode.objects.get(mode_type=mode_type, is_active=True)
+            except CalculatorMode.DoesNotExist:
+                return Response({
+                    'error': f'Modalidad {mode_type} no encontrada o inactiva'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if mode.mode_type != 'credito':
+                return Response({
+                    'error': 'La tabla de cuotas solo está disponible para Crédito Inmediato'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if product_price <= 0:
+                return Response({
+                    'error': 'Debe indicar un producto o un precio válido'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            down_payment_options = mode.get_down_payment_options()
+            term_options = mode.get_term_options()
+            frequencies = [value for value, label in FinancingRequest.PAYMENT_FREQUENCIES]
+
+            # Calcular toda la matriz en un solo lote
+            quotes = calculate_grid(
+                product_price,
+                down_payment_options,
+                term_options,
+                frequencies,
+                mode.interest_rate
+            )
+
+            grid = {
+                'mode': {
+                    'name': mode.name,
+                    'type': mode.mode_type,
+                    'interest_rate': float(mode.interest_rate)
+                },
+                'product': product_data,
+                'vehicle_value': float(product_price),
+                'down_payment_options': down_payment_options,
+                'term_options': term_options,
+                'payment_frequencies': [
+                    {'value': value, 'label': label}
+                    for value, label in FinancingRequest.PAYMENT_FREQUENCIES
+                ],
+                'quotes': [
+                    {
+                        'down_payment_percentage': float(quote.down_payment_percentage),
+                        'term_months': quote.term_months,
+                        'payment_frequency': quote.payment_frequency,
+                        'down_payment_amount': float(quote.down_payment_amount),
+                        'financed_amount': float(quote.financed_amount),
+                        'number_of_payments': quote.number_of_payments,
+                        'payment_amount': float(quote.payment_amount),
+                        'last_payment_amount': float(quote.last_payment_amount),
+                        'total_cost': float(quote.total_amount),
+                        'total_interest': float(quote.total_interest)
+                    }
+                    for quote in quotes
+                ]
+            }
+
+            quote_cache.set(cache_key, grid)
+            return Response(grid)
+
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CalculatorCacheStatsView(APIView):
+    """Contadores del caché de cotizaciones (solo administradores)"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(quote_cache.stats())
+
+
+class DelinquencyAgingView(APIView):
+    """Antigüedad de la cartera vencida por tramo (solo administradores)"""
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        application_id = request.query_params.get('application_id')
+        if application_id is not None and not application_id.isdigit():
+            return Response(
+                {'error': 'application_id debe ser un número'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        buckets = aging_totals(int(application_id) if application_id else None)
         return Response({
-            'success': True,
-            'data': data
+            'buckets': buckets,
+            'total_installments': sum(row['installments'] for row in buckets),
+            'total_amount': sum(row['amount'] for row in buckets),
+            'total_late_fees': sum(row['late_fees'] for row in buckets)
         })
 
 
+class PaymentMethodListView(APIView):
+    """Lista de métodos de pago disponibles"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        # Payload pre-serializado; se reconstruye al cambiar métodos o cuentas
+        content, etag = cached_payload('payment_methods', build_payment_methods)
+        return not_modified(request, etag) or set_validators(
+            HttpResponse(content, content_type='application/json'), etag
+        )
+
+
 class PaymentSubmissionView(APIView):
     """Vista para enviar comprobantes de pago"""
     permission_classes = [permissions.IsAuthenticated]
@@ -893,7 +1228,23 @@ class PaymentSubmissionView(APIView):
             
             # Validar archivo de comprobante si es requerido
             receipt_file = request.FILES.get('receipt_file')
-            if payment_method.requires_receipt and not receipt_file:
+            # O un comprobante ya subido por fragmentos (ver ChunkedUploadCreateView)
+            receipt_upload = None
+            if not receipt_file and request.data.get('receipt_upload_id'):
+                try:
+                    receipt_upload = ChunkedUpload.objects.get(
+                        pk=request.data['receipt_upload_id'],
+                        user=request.user,
+                        target='receipt_file',
+                        status='complete',
+                        payment__isnull=True
+                    )
+                except (ChunkedUpload.DoesNotExist, ValueError, DjangoValidationError):
+                    return Response({
+                        'success': False,
+                        'error': 'Comprobante subido no encontrado'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            if payment_method.requires_receipt and not (receipt_file or receipt_upload):
                 return Response({
                     'success': False,
                     'error': 'Este método de pago requiere comprobante'
@@ -907,9 +1258,21 @@ class PaymentSubmissionView(APIView):
                     'error': 'Este método de pago requiere número de referencia'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
+            # Cuota a la que se imputa el pago; si es virtual se guarda ahora
+            payment_schedule = None
+            if request.data.get('payment_number'):
+                try:
+                    payment_schedule = application.materialize_installment(int(request.data['payment_number']))
+                except (ValueError, TypeError, PaymentSchedule.DoesNotExist):
+                    return Response({
+                        'success': False,
+                        'error': 'Número de cuota no válido'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+            
             # Crear el pago
-            payment = Payment.objects.create(
+            payment = Payment(
                 application=application,
+                payment_schedule=payment_schedule,
                 payment_method=payment_method,
                 company_account=company_account,
                 payment_type=request.data.get('payment_type', 'installment'),
@@ -928,6 +1291,11 @@ class PaymentSubmissionView(APIView):
                 ip_address=self.get_client_ip(request),
                 user_agent=request.META.get('HTTP_USER_AGENT', '')
             )
+            if receipt_upload is not None:
+                with transaction.atomic():
+                    chunked_uploads.attach(receipt_upload, payment)
+            else:
+                payment.save()
             
             # Crear respuesta
             payment_data = {
@@ -967,76 +1335,133 @@ class PaymentSubmissionView(APIView):
 
 
 class UserPaymentsView(APIView):
-    """Vista para obtener los pagos del usuario"""
+    """
+    Vista para obtener los pagos del usuario, paginados por cursor.
+
+    Los pagos se recorren del más reciente al más antiguo sobre el índice
+    (payment_date, id): cada página pide las filas anteriores a la última
+    entregada en lugar de saltar un OFFSET, y sólo se leen las columnas que
+    se devuelven, así que el costo de una página no crece con el historial.
+
+    Parámetros: application_id, status, limit (máx. 100) y cursor (el
+    next_cursor de la página anterior).
+    """
     permission_classes = [permissions.IsAuthenticated]
-    
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+    FIELDS = (
+        'id', 'application__application_number', 'payment_type', 'payment_method',
+        'amount', 'currency', 'status', 'payment_date', 'submitted_at', 'verified_at',
+        'reference_number', 'transaction_id', 'receipt_file', 'customer_notes',
+        'rejection_reason',
+    )
+
+    @staticmethod
+    def encode_cursor(payment_date, payment_id):
+        value = f'{payment_date.isoformat()}|{payment_id}'
+        return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """(payment_date, id) del cursor; ValueError si no es válido"""
+        # binascii.Error y UnicodeDecodeError también son ValueError
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payment_date, payment_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(payment_date), int(payment_id)
+
     def get(self, request):
         try:
             # Obtener parámetros de consulta
             application_id = request.GET.get('application_id')
             status_filter = request.GET.get('status')
-            
+            cursor = request.GET.get('cursor')
+            try:
+                limit = min(max(int(request.GET.get('limit', self.DEFAULT_LIMIT)), 1), self.MAX_LIMIT)
+            except ValueError:
+                return Response({
+                    'success': False,
+                    'error': 'El parámetro limit debe ser un número entero'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
             # Construir queryset
             queryset = Payment.objects.filter(
                 application__customer__user=request.user
-            ).select_related(
-                'application', 'payment_method', 'company_account', 'verified_by'
-            ).order_by('-payment_date')
-            
+            ).order_by('-payment_date', '-id')
+
             # Aplicar filtros
             if application_id:
                 queryset = queryset.filter(application_id=application_id)
-            
+
             if status_filter:
                 queryset = queryset.filter(status=status_filter)
-            
+
+            if cursor:
+                try:
+                    payment_date, payment_id = self.decode_cursor(cursor)
+                except ValueError:
+                    return Response({
+                        'success': False,
+                        'error': 'Cursor inválido'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(
+                    Q(payment_date__lt=payment_date) |
+                    Q(payment_date=payment_date, id__lt=payment_id)
+                )
+
+            # Una fila de más indica si hay otra página
+            rows = list(queryset.values(*self.FIELDS)[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            payment_types = dict(Payment.TYPES)
+            payment_methods = dict(Payment.PAYMENT_METHOD_CHOICES)
+            statuses = dict(Payment.STATUSES)
+
             # Serializar datos
             payments_data = []
-            for payment in queryset:
-                payment_data = {
-                    'id': payment.id,
-                    'application_number': payment.application.application_number,
-                    'payment_type': payment.get_payment_type_display(),
-                    'payment_method': payment.payment_method.name,
-                    'amount': float(payment.amount),
-                    'currency': payment.currency,
-                    'status': payment.get_status_display(),
-                    'status_code': payment.status,
-                    'payment_date': payment.payment_date.isoformat(),
-                    'submitted_at': payment.submitted_at.isoformat(),
-                    'verified_at': payment.verified_at.isoformat() if payment.verified_at else None,
-                    'reference_number': payment.reference_number,
-                    'transaction_id': payment.transaction_id,
-                    'has_receipt': bool(payment.receipt_file),
-                    'receipt_url': payment.receipt_file.url if payment.receipt_file else None,
-                    'customer_notes': payment.customer_notes,
-                    'admin_notes': payment.admin_notes,
-                    'rejection_reason': payment.rejection_reason,
-                    'verification_timeline': str(payment.get_verification_timeline()) if payment.verified_at else None
-                }
-                
-                if payment.company_account:
-                    payment_data['company_account'] = {
-                        'bank_name': payment.company_account.bank_name,
-                        'account_number': payment.company_account.account_number,
-                        'currency': payment.company_account.currency
-                    }
-                
-                payments_data.append(payment_data)
-            
+            for row in rows:
+                verified_at = row['verified_at']
+                payments_data.append({
+                    'id': row['id'],
+                    'application_number': row['application__application_number'],
+                    'payment_type': payment_types.get(row['payment_type'], row['payment_type']),
+                    'payment_method': payment_methods.get(row['payment_method'], row['payment_method']),
+                    'amount': float(row['amount']),
+                    'currency': row['currency'],
+                    'status': statuses.get(row['status'], row['status']),
+                    'status_code': row['status'],
+                    'payment_date': row['payment_date'].isoformat(),
+                    'submitted_at': row['submitted_at'].isoformat(),
+                    'verified_at': verified_at.isoformat() if verified_at else None,
+                    'reference_number': row['reference_number'],
+                    'transaction_id': row['transaction_id'],
+                    'has_receipt': bool(row['receipt_file']),
+                    'receipt_url': default_storage.url(row['receipt_file']) if row['receipt_file'] else None,
+                    'customer_notes': row['customer_notes'],
+                    'rejection_reason': row['rejection_reason'],
+                    'verification_timeline': str(verified_at - row['submitted_at']) if verified_at else None
+                })
+
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                next_cursor = self.encode_cursor(last['payment_date'], last['id'])
+
             return Response({
                 'success': True,
                 'data': payments_data,
-                'total': len(payments_data)
+                'count': len(payments_data),
+                'has_more': has_more,
+                'next_cursor': next_cursor
             })
-            
+
         except Exception as e:
             return Response({
                 'success': False,
                 'error': f'Error al obtener pagos: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-
 class PaymentStatusView(APIView):
     """Vista para obtener el estado de un pago específico"""
     permission_classes = [permissions.IsAuthenticated]
@@ -1098,6 +1523,226 @@ class PaymentStatusView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def chunked_upload_data(upload):
+    return {
+        'upload_id': str(upload.pk),
+        'target': upload.target,
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.offset,
+        'status': upload.status,
+        'sha256': upload.sha256 or None,
+        'chunk_size': chunked_uploads.chunk_size()
+    }
+
+
+def chunked_upload_error(error):
+    """409 con el offset vigente si el cliente debe continuar desde otro punto"""
+    data = {'success': False, 'error': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+        return Response(data, status=status.HTTP_409_CONFLICT)
+    return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ChunkedUploadCreateView(APIView):
+    """Crea una subida por fragmentos (ver financing/chunked_uploads.py)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        target = request.data.get('target')
+        if target not in dict(ChunkedUpload.TARGETS):
+            return Response({
+                'success': False,
+                'error': 'Destino no válido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        filename = request.data.get('filename', '')
+        try:
+            size = int(request.data.get('size'))
+        except (ValueError, TypeError):
+            return Response({
+                'success': False,
+                'error': 'Tamaño no válido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        expected_sha256 = (request.data.get('sha256') or '').lower()
+        if expected_sha256 and (len(expected_sha256) != 64 or set(expected_sha256) - set('0123456789abcdef')):
+            return Response({
+                'success': False,
+                'error': 'SHA-256 no válido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            chunked_uploads.validate_new_upload(filename, size)
+        except chunked_uploads.UploadError as e:
+            return chunked_upload_error(e)
+
+        application = None
+        payment = None
+        if target in chunked_uploads.DOCUMENT_TARGETS:
+            try:
+                application = FinancingRequest.objects.get(
+                    id=request.data.get('application_id'),
+                    customer__user=request.user
+                )
+            except (FinancingRequest.DoesNotExist, ValueError, TypeError):
+                return Response({
+                    'success': False,
+                    'error': 'Solicitud de financiamiento no encontrada'
+                }, status=status.HTTP_404_NOT_FOUND)
+            if application.status not in ['submitted', 'documentation_required']:
+                return Response({
+                    'success': False,
+                    'error': 'No se pueden subir documentos en este estado'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        elif request.data.get('payment_id'):
+            # Sin pago, el comprobante se usa luego en submit-payment (receipt_upload_id)
+            try:
+                payment = Payment.objects.get(
+                    id=request.data['payment_id'],
+                    application__customer__user=request.user
+                )
+            except (Payment.DoesNotExist, ValueError, TypeError):
+                return Response({
+                    'success': False,
+                    'error': 'Pago no encontrado'
+                }, status=status.HTTP_404_NOT_FOUND)
+            if payment.status != 'pending':
+                return Response({
+                    'success': False,
+                    'error': 'Solo se puede cambiar el comprobante de un pago pendiente'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = ChunkedUpload.objects.create(
+            user=request.user,
+            target=target,
+            application=application,
+            payment=payment,
+            filename=filename,
+            size=size,
+            expected_sha256=expected_sha256
+        )
+        return Response({
+            'success': True,
+            'data': chunked_upload_data(upload)
+        }, status=status.HTTP_201_CREATED)
+
+
+class ChunkedUploadView(APIView):
+    """
+    Estado (GET), envío de un fragmento (PUT) o cancelación (DELETE) de una
+    subida. El PUT lleva el encabezado Upload-Offset y los bytes en el
+    cuerpo; el cuerpo se lee por bloques y no pasa por los parsers.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_upload(self, request, upload_id):
+        return ChunkedUpload.objects.filter(pk=upload_id, user=request.user).first()
+
+    def not_found(self):
+        return Response({
+            'success': False,
+            'error': 'Subida no encontrada'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return self.not_found()
+        return Response({'success': True, 'data': chunked_upload_data(upload)})
+
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return self.not_found()
+
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+        except (KeyError, ValueError):
+            return Response({
+                'success': False,
+                'error': 'El encabezado Upload-Offset es requerido'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length <= 0:
+            return Response({
+                'success': False,
+                'error': 'Se requiere Content-Length'
+            }, status=status.HTTP_411_LENGTH_REQUIRED)
+
+        try:
+            chunked_uploads.write_chunk(upload, offset, request.stream, length)
+        except chunked_uploads.UploadError as e:
+            return chunked_upload_error(e)
+        return Response({'success': True, 'data': chunked_upload_data(upload)})
+
+    def delete(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return self.not_found()
+        if upload.status == 'attached':
+            return Response({
+                'success': False,
+                'error': 'La subida ya fue adjuntada'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        chunked_uploads.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ChunkedUploadCompleteView(APIView):
+    """Verifica la subida y adjunta el archivo a su pago o solicitud"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id):
+        upload = ChunkedUpload.objects.select_related('application', 'payment').filter(
+            pk=upload_id, user=request.user
+        ).first()
+        if upload is None:
+            return Response({
+                'success': False,
+                'error': 'Subida no encontrada'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if (upload.application is not None and upload.status != 'attached'
+                and upload.application.status not in ['submitted', 'documentation_required']):
+            return Response({
+                'success': False,
+                'error': 'No se pueden subir documentos en este estado'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if (upload.payment is not None and upload.status != 'attached'
+                and upload.payment.status != 'pending'):
+            return Response({
+                'success': False,
+                'error': 'Solo se puede cambiar el comprobante de un pago pendiente'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            chunked_uploads.complete(upload)
+            if upload.status == 'complete' and (upload.application or upload.payment):
+                with transaction.atomic():
+                    instance = None
+                    if upload.payment is not None:
+                        # Se bloquea el pago para no pisar una verificación concurrente
+                        instance = Payment.objects.select_for_update().get(pk=upload.payment_id)
+                        if instance.status != 'pending':
+                            raise chunked_uploads.UploadError(
+                                'Solo se puede cambiar el comprobante de un pago pendiente'
+                            )
+                    chunked_uploads.attach(upload, instance)
+        except chunked_uploads.UploadError as e:
+            return chunked_upload_error(e)
+
+        data = chunked_upload_data(upload)
+        attached_to = upload.application or upload.payment
+        if upload.status == 'attached' and attached_to is not None:
+            data['file_url'] = getattr(attached_to, upload.target).url
+        return Response({'success': True, 'data': data})
+
 # Vista temporalmente comentada hasta crear migración para PaymentAttachment
 # @api_view(['POST'])
 # @permission_classes([permissions.IsAuthenticated])
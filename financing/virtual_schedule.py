@@ -0,0 +1,89 @@
+"""
+Cronogramas de pago virtuales.
+
+Mientras una cuota no recibe un pago, un cargo por mora o un ajuste manual,
+es una función pura de los términos de la solicitud (monto, número de
+cuotas, frecuencia y fecha de aprobación). Con VIRTUAL_PAYMENT_SCHEDULES
+activo la aprobación no escribe el cronograma: las cuotas se calculan al
+leerlas con FinancingRequest.build_payment_schedule y sólo se guarda una
+fila de PaymentSchedule cuando algo la modifica (materialize_installment,
+materialize_overdue). Las filas guardadas reemplazan a las calculadas con el
+mismo número de cuota, así que los lectores reciben el cronograma completo
+con la misma forma que antes; las cuotas virtuales se serializan con id nulo.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+# Estados en los que una solicitud tiene cronograma
+SCHEDULED_STATUSES = ('approved', 'active', 'completed')
+
+
+def virtual_schedules_enabled():
+    return getattr(settings, 'VIRTUAL_PAYMENT_SCHEDULES', False)
+
+
+def merge_schedule(application, stored, today=None):
+    """Cronograma completo: filas guardadas sobre las cuotas calculadas"""
+    today = today or timezone.now().date()
+    stored = {item.payment_number: item for item in stored}
+
+    schedule = []
+    for item in application.build_payment_schedule():
+        persisted = stored.pop(item.payment_number, None)
+        if persisted is not None:
+            schedule.append(persisted)
+            continue
+        # El atraso de una cuota virtual se calcula al leerla; el cargo por
+        # mora sólo existe una vez guardada
+        if item.due_date < today:
+            item.days_late = (today - item.due_date).days
+        schedule.append(item)
+
+    # Filas guardadas fuera del plan vigente (por ejemplo, de un plazo anterior)
+    schedule.extend(stored.values())
+    schedule.sort(key=lambda item: item.payment_number)
+    return schedule
+
+
+def pending_by_month(applications, before):
+    """
+    Cuotas pendientes agrupadas por mes de vencimiento, como
+    (solicitud, primer día del mes, total), incluidas las virtuales.
+    """
+    totals = defaultdict(int)
+    for application in applications.prefetch_related('payment_schedule'):
+        for item in application.get_payment_schedule():
+            if not item.is_paid and item.due_date < before:
+                totals[(application.id, item.due_date.replace(day=1))] += item.amount
+    return [(application_id, month, total) for (application_id, month), total in totals.items()]
+
+
+def materialize_overdue(applications=None, as_of=None):
+    """
+    Guarda las cuotas virtuales vencidas antes de ``as_of`` para que el
+    cálculo de mora pueda actualizarlas en la base de datos. Retorna el
+    número de filas creadas.
+    """
+    from .models import FinancingRequest, PaymentSchedule
+
+    if not virtual_schedules_enabled():
+        return 0
+    as_of = as_of or timezone.now().date()
+    if applications is None:
+        applications = FinancingRequest.objects.all()
+
+    created = 0
+    rows = []
+    applications = applications.filter(status__in=SCHEDULED_STATUSES).prefetch_related('payment_schedule')
+    for application in applications.iterator(chunk_size=500):
+        for item in application.get_payment_schedule():
+            if item.pk is None and item.due_date < as_of:
+                rows.append(item)
+        if len(rows) >= 1000:
+            created += len(PaymentSchedule.objects.bulk_create(rows, ignore_conflicts=True))
+            rows = []
+    if rows:
+        created += len(PaymentSchedule.objects.bulk_create(rows, ignore_conflicts=True))
+    return created
@@ -65,6 +65,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'core.snapshots.SnapshotMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -151,6 +152,33 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cronogramas de pago calculados al leerlos; sólo se guardan las cuotas con
+# pagos, mora o ajustes (ver financing/virtual_schedule.py)
+VIRTUAL_PAYMENT_SCHEDULES = os.environ.get('VIRTUAL_PAYMENT_SCHEDULES', 'False') == 'True'
+
+# Números de solicitud reservados por proceso en cada acceso al contador
+# (1 = sin bloques; ver financing/application_numbers.py)
+APPLICATION_NUMBER_BLOCK_SIZE = int(os.environ.get('APPLICATION_NUMBER_BLOCK_SIZE', '1'))
+
+# Mora de cuotas programadas (ver financing/late_fees.py): LATE_FEE_RATE del
+# monto por cada LATE_FEE_PERIOD_DAYS días de atraso después de la gracia
+LATE_FEE_GRACE_DAYS = int(os.environ.get('LATE_FEE_GRACE_DAYS', '0'))
+LATE_FEE_PERIOD_DAYS = int(os.environ.get('LATE_FEE_PERIOD_DAYS', '7'))
+LATE_FEE_RATE = os.environ.get('LATE_FEE_RATE', '0.01')
+LATE_FEE_MAX_RATE = os.environ.get('LATE_FEE_MAX_RATE') or None
+
+# Subidas reanudables por fragmentos (ver financing/chunked_uploads.py); los
+# temporales quedan bajo MEDIA_ROOT para moverlos sin copiar al completarse
+CHUNKED_UPLOAD_DIR = os.path.join(MEDIA_ROOT, 'chunked_uploads')
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', str(20 * 1024 * 1024)))
+CHUNKED_UPLOAD_EXPIRE_HOURS = int(os.environ.get('CHUNKED_UPLOAD_EXPIRE_HOURS', '24'))
+
+# Snapshots JSON pre-comprimidos de endpoints públicos (ver core/snapshots.py)
+API_SNAPSHOTS_ENABLED = os.environ.get('API_SNAPSHOTS_ENABLED', 'False') == 'True'
+API_SNAPSHOT_ROOT = os.environ.get('API_SNAPSHOT_ROOT', os.path.join(BASE_DIR, 'snapshots'))
+API_SNAPSHOT_HOST = os.environ.get('API_SNAPSHOT_HOST', 'llevateloexpress.com')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -1,6 +1,15 @@
 from rest_framework import serializers
 from products.models import Category, Product
 
+def get_monthly_payment_from(product):
+    """Cuota mensual más baja precalculada (ver financing.quote_tables)"""
+    if hasattr(product, 'monthly_payment_from'):
+        value = product.monthly_payment_from
+    else:
+        quote = product.quotes.filter(payment_frequency='monthly').order_by('payment_amount').first()
+        value = quote.payment_amount if quote else None
+    return float(value) if value is not None else None
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -8,16 +17,25 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class ProductListSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
+    monthly_payment_from = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'category', 'category_name', 'brand', 'price', 'image', 'featured']
+        fields = ['id', 'name', 'category', 'category_name', 'brand', 'price', 'image', 'featured',
+                 'monthly_payment_from']
+    
+    def get_monthly_payment_from(self, obj):
+        return get_monthly_payment_from(obj)
 
 class ProductDetailSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
+    monthly_payment_from = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
         fields = ['id', 'name', 'category', 'category_name', 'brand', 'price', 
                  'image', 'description', 'features', 'specs_general', 'specs_engine', 
-                 'specs_comfort', 'specs_safety', 'stock', 'featured']
+                 'specs_comfort', 'specs_safety', 'stock', 'featured', 'monthly_payment_from']
+    
+    def get_monthly_payment_from(self, obj):
+        return get_monthly_payment_from(obj)
@@ -1,32 +1,69 @@
 from django.shortcuts import render
 from rest_framework import viewsets, generics
 from rest_framework.response import Response
+from django.db.models import Count, Max
+from core.conditional import ConditionalGetMixin
 from .models import Category, Product
 from .serializers.product_serializers import CategorySerializer, ProductListSerializer, ProductDetailSerializer
+from financing.models import ProductQuote
+from financing.quote_tables import with_monthly_payment_from
 
 # Create your views here.
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+def categories_state():
+    """Huella de la tabla de categorías (pocas filas y sin fecha de modificación)"""
+    return tuple(Category.objects.order_by('pk').values_list('id', 'name', 'slug', 'description', 'icon'))
+
+def catalog_state():
+    """
+    Estado del catálogo para respuestas condicionales: conteos y última
+    modificación de productos y cotizaciones precalculadas, más las categorías.
+
+    No se envía Last-Modified: renombrar una categoría o borrar una fila no
+    mueve ningún updated_at, así que sólo el ETag refleja esos cambios.
+    """
+    products = Product.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+    quotes = ProductQuote.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+    state = (products['count'], products['last'], quotes['count'], quotes['last'], categories_state())
+    return state, None
+
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    
+    def get_conditional_state(self):
+        return categories_state(), None
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.all()
     
+    def get_conditional_state(self):
+        return catalog_state()
+    
+    def get_queryset(self):
+        return with_monthly_payment_from(super().get_queryset().select_related('category'))
+    
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return ProductDetailSerializer
         return ProductListSerializer
 
-class FeaturedProductsView(generics.ListAPIView):
+class FeaturedProductsView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = ProductListSerializer
     
+    def get_conditional_state(self):
+        return catalog_state()
+    
     def get_queryset(self):
-        return Product.objects.filter(featured=True)
+        return with_monthly_payment_from(
+            Product.objects.filter(featured=True).select_related('category')
+        )
 
 class ProductsByCategoryView(generics.ListAPIView):
     serializer_class = ProductListSerializer
     
     def get_queryset(self):
         category_slug = self.kwargs['category_slug']
-        return Product.objects.filter(category__slug=category_slug)
+        return with_monthly_payment_from(
+            Product.objects.filter(category__slug=category_slug).select_related('category')
+        )